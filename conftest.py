@@ -0,0 +1,46 @@
+"""
+Shared pytest fixtures for the Instagram Agents tests.
+"""
+
+import os
+
+import orjson
+import pytest
+
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def pytest_report_header(config):
+    """Header line shown above the test run."""
+    return "Running Instagram Agents Tests"
+
+
+@pytest.fixture(scope="session")
+def config_file():
+    """Path to the project's config.json, independent of the working directory."""
+    return os.path.join(PROJECT_ROOT, "config.json")
+
+
+@pytest.fixture(scope="session")
+def config(config_file):
+    """Parsed config.json, loaded once per test session."""
+    with open(config_file, "rb") as f:
+        return orjson.loads(f.read())
+
+
+@pytest.fixture(scope="session")
+def style_parser():
+    """StyleVaultParser for the project's style_vault.md, shared by all tests."""
+    from src.style_vault_parser import StyleVaultParser
+    
+    vault_file = os.path.join(PROJECT_ROOT, "style_vault.md")
+    if not os.path.exists(vault_file):
+        pytest.skip("style_vault.md missing")
+    return StyleVaultParser(vault_file)
+
+
+@pytest.fixture(scope="session")
+def style_posts(style_parser):
+    """Posts parsed from style_vault.md, parsed once per test session."""
+    return style_parser.load_style_vault()
@@ -5,12 +5,12 @@ Demonstrates how to use the Style Vault feature
 
 from src.style_vault_parser import StyleVaultParser
 
+BANNER = "=" * 80
+RULE = "   " + "-" * 76
+
 
 def main():
-    print("="*80)
-    print("STYLE VAULT DEMO")
-    print("="*80)
-    print()
+    print(f"{BANNER}\nSTYLE VAULT DEMO\n{BANNER}\n")
     
     # Initialize parser
     parser = StyleVaultParser("style_vault.md")
@@ -54,9 +54,9 @@ def main():
     print(f"   Generated {len(examples)} characters of example text")
     print()
     print("   Preview (first 500 chars):")
-    print("   " + "-"*76)
+    print(RULE)
     print("   " + examples[:500].replace("\n", "\n   "))
-    print("   " + "-"*76)
+    print(RULE)
     print()
     
     # 6. Show how it's used in config
@@ -71,10 +71,7 @@ def main():
    }
    """)
     
-    print("="*80)
-    print("DEMO COMPLETE")
-    print("="*80)
-    print()
+    print(f"{BANNER}\nDEMO COMPLETE\n{BANNER}\n")
     print("To use the Style Vault:")
     print("  1. Enable in config.json: 'use_style_vault': true")
     print("  2. Add your own examples to style_vault.md")
@@ -9,10 +9,11 @@ import os
 import sys
 from pathlib import Path
 
+BANNER = "=" * 80
+SEP = "\n" + BANNER + "\n"
+
 # Example 1: Basic usage
-print("="*80)
-print("EXAMPLE 1: Basic Usage")
-print("="*80)
+print(f"{BANNER}\nEXAMPLE 1: Basic Usage\n{BANNER}")
 print("""
 To run the workflow with the default topic from config.json:
 
@@ -27,9 +28,7 @@ This will:
 """)
 
 # Example 2: Custom topic
-print("\n" + "="*80)
-print("EXAMPLE 2: Custom Topic")
-print("="*80)
+print(f"{SEP}EXAMPLE 2: Custom Topic\n{BANNER}")
 print("""
 To create a post about a specific topic:
 
@@ -44,9 +43,7 @@ You can use any data science or machine learning topic:
 """)
 
 # Example 3: Custom configuration
-print("\n" + "="*80)
-print("EXAMPLE 3: Custom Configuration")
-print("="*80)
+print(f"{SEP}EXAMPLE 3: Custom Configuration\n{BANNER}")
 print("""
 To use a custom configuration file:
 
@@ -60,9 +57,7 @@ This is useful when you want to:
 """)
 
 # Example 4: Specify output file
-print("\n" + "="*80)
-print("EXAMPLE 4: Specify Output File")
-print("="*80)
+print(f"{SEP}EXAMPLE 4: Specify Output File\n{BANNER}")
 print("""
 To save the output to a specific file:
 
@@ -75,9 +70,7 @@ The output JSON file will contain:
 """)
 
 # Example 5: Configuration customization
-print("\n" + "="*80)
-print("EXAMPLE 5: Configuration Customization")
-print("="*80)
+print(f"{SEP}EXAMPLE 5: Configuration Customization\n{BANNER}")
 print("""
 Edit config.json to customize the workflow:
 
@@ -108,9 +101,7 @@ Edit config.json to customize the workflow:
 """)
 
 # Example 6: Environment setup
-print("\n" + "="*80)
-print("EXAMPLE 6: Environment Setup")
-print("="*80)
+print(f"{SEP}EXAMPLE 6: Environment Setup\n{BANNER}")
 print("""
 Required steps before running:
 
@@ -136,9 +127,7 @@ Required steps before running:
 """)
 
 # Example 7: Output structure
-print("\n" + "="*80)
-print("EXAMPLE 7: Output Structure")
-print("="*80)
+print(f"{SEP}EXAMPLE 7: Output Structure\n{BANNER}")
 print("""
 The workflow produces several outputs:
 
@@ -173,9 +162,7 @@ The workflow produces several outputs:
 """)
 
 # Example 8: Workflow overview
-print("\n" + "="*80)
-print("EXAMPLE 8: Workflow Overview")
-print("="*80)
+print(f"{SEP}EXAMPLE 8: Workflow Overview\n{BANNER}")
 print("""
 The workflow follows these steps:
 
@@ -205,44 +192,45 @@ The workflow follows these steps:
 6. FINALIZE: Post is saved and workflow completes
 """)
 
-# Check if API keys are set
-print("\n" + "="*80)
-print("ENVIRONMENT CHECK")
-print("="*80)
-
-# Load .env if exists
-from dotenv import load_dotenv
-load_dotenv()
-
-api_keys = {
-    "TAVILY_API_KEY": os.getenv("TAVILY_API_KEY"),
-    "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY"),
-    "ANTHROPIC_API_KEY": os.getenv("ANTHROPIC_API_KEY"),
-    "GOOGLE_API_KEY": os.getenv("GOOGLE_API_KEY"),
-    "XAI_API_KEY": os.getenv("XAI_API_KEY"),
-}
-
-print("\nAPI Key Status:")
-for key, value in api_keys.items():
-    status = "✅ Set" if value else "❌ Not set"
-    print(f"  {key}: {status}")
-
-tavily_set = bool(api_keys["TAVILY_API_KEY"])
-llm_set = any([api_keys["OPENAI_API_KEY"], api_keys["ANTHROPIC_API_KEY"], 
-               api_keys["GOOGLE_API_KEY"], api_keys["XAI_API_KEY"]])
-
-print("\nReadiness:")
-if tavily_set and llm_set:
-    print("  ✅ System is ready to run!")
-    print("  Run: python main.py --topic 'Your Topic'")
-elif not tavily_set:
-    print("  ❌ Tavily API key is required")
-    print("  Please set TAVILY_API_KEY in .env file")
-elif not llm_set:
-    print("  ❌ At least one LLM API key is required")
-    print("  Please set one of: OPENAI_API_KEY, ANTHROPIC_API_KEY, GOOGLE_API_KEY, or XAI_API_KEY")
-else:
-    print("  ❌ Missing required API keys")
-    print("  Please check .env file")
-
-print("\n" + "="*80)
+# Provider keys checked by the environment report; any one LLM key is enough
+LLM_API_KEYS = ("OPENAI_API_KEY", "ANTHROPIC_API_KEY", "GOOGLE_API_KEY", "XAI_API_KEY")
+API_KEYS = ("TAVILY_API_KEY",) + LLM_API_KEYS
+
+
+def check_environment():
+    """Report which API keys are set and whether the workflow is ready to run."""
+    print(f"{SEP}ENVIRONMENT CHECK\n{BANNER}")
+    
+    set_keys = {key for key in API_KEYS if os.environ.get(key)}
+    
+    print("\nAPI Key Status:")
+    for key in API_KEYS:
+        status = "✅ Set" if key in set_keys else "❌ Not set"
+        print(f"  {key}: {status}")
+    
+    tavily_set = "TAVILY_API_KEY" in set_keys
+    llm_set = not set_keys.isdisjoint(LLM_API_KEYS)
+    
+    print("\nReadiness:")
+    if tavily_set and llm_set:
+        print("  ✅ System is ready to run!")
+        print("  Run: python main.py --topic 'Your Topic'")
+    elif not tavily_set:
+        print("  ❌ Tavily API key is required")
+        print("  Please set TAVILY_API_KEY in .env file")
+    elif not llm_set:
+        print("  ❌ At least one LLM API key is required")
+        print("  Please set one of: OPENAI_API_KEY, ANTHROPIC_API_KEY, GOOGLE_API_KEY, or XAI_API_KEY")
+    else:
+        print("  ❌ Missing required API keys")
+        print("  Please check .env file")
+    
+    print(f"\n{BANNER}")
+
+
+if __name__ == "__main__":
+    # Load .env if exists
+    from dotenv import load_dotenv
+    load_dotenv()
+    
+    check_environment()
@@ -5,20 +5,57 @@ Main entry point for the Instagram Agents workflow.
 import os
 import sys
 import argparse
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
-from langchain_core.language_models import init_chat_model
 
 from src.utils import setup_logging, load_config, save_final_post, format_post_for_display
-from src.researcher_agent import ResearcherAgent
-from src.drafter_agent import DrafterAgent
-from src.editor_agent import EditorInChiefAgent
-from src.workflow import InstagramWorkflow
+
+
+# One lock per cache key: concurrent misses on the same model are built once,
+# while different models still initialize in parallel
+_base_llm_locks = {}
+_base_llm_locks_guard = threading.Lock()
+
+
+def _base_llm_lock(key: tuple) -> threading.Lock:
+    """Return the lock guarding construction of the base model for key."""
+    with _base_llm_locks_guard:
+        return _base_llm_locks.setdefault(key, threading.Lock())
+
+
+@functools.lru_cache(maxsize=8)
+def _get_base_llm(model_name: str, max_tokens: int, model_kwargs: tuple):
+    """
+    Create the base chat model shared by every agent using the same model.
+    
+    Args:
+        model_name: Name of the model
+        max_tokens: Maximum number of output tokens
+        model_kwargs: Extra model parameters as sorted (key, value) pairs
+        
+    Returns:
+        Initialized language model
+    """
+    # Imported here so `--help` and argument errors skip LangChain's import cost
+    from langchain_core.language_models import init_chat_model
+    
+    return init_chat_model(
+        model=model_name,
+        max_tokens=max_tokens,
+        model_kwargs=dict(model_kwargs)
+    )
 
 
 def initialize_llm(model_name: str, **kwargs):
     """
     Initialize a language model using init_chat_model.
     
+    Agents that share a model name and token limit reuse one underlying client
+    (and its HTTP connection pool); only the sampling temperature differs.
+    
     Args:
         model_name: Name of the model (e.g., 'gpt-4o', 'claude-3-5-sonnet-20241022', 'gemini-2.0-flash-exp')
         **kwargs: Additional parameters like temperature, max_tokens, etc.
@@ -35,13 +72,18 @@ def initialize_llm(model_name: str, **kwargs):
         filtered_kwargs = {k: v for k, v in kwargs.items() 
                          if k not in ['temperature', 'max_output_tokens', 'max_tokens']}
         
-        # Initialize the model
-        llm = init_chat_model(
-            model=model_name,
-            temperature=temperature,
-            max_tokens=max_tokens,
-            model_kwargs=filtered_kwargs
-        )
+        # Models are initialized from worker threads, so guard the cache to
+        # avoid building the same client twice on a concurrent miss
+        key = (model_name, max_tokens, tuple(sorted(filtered_kwargs.items())))
+        with _base_llm_lock(key):
+            base_llm = _get_base_llm(*key)
+        
+        # Rebuild from the base model's fields so the copy shares its client
+        # (and HTTP connection pool) but still runs the model's validators,
+        # e.g. ChatOpenAI dropping temperature for models that reject it
+        model_cls = type(base_llm)
+        fields = {k: v for k, v in base_llm.__dict__.items() if k in model_cls.model_fields}
+        llm = model_cls.model_validate({**fields, "temperature": temperature})
         
         return llm
         
@@ -74,6 +116,12 @@ def main():
     
     args = parser.parse_args()
     
+    # Deferred until arguments parse: the agents pull in LangChain, LangGraph and Tavily
+    from src.researcher_agent import ResearcherAgent
+    from src.drafter_agent import DrafterAgent
+    from src.editor_agent import EditorInChiefAgent
+    from src.workflow import InstagramWorkflow
+    
     # Load environment variables
     load_dotenv()
     
@@ -101,6 +149,16 @@ def main():
     logger.info("Instagram Agents Workflow Starting")
     logger.info("="*80)
     
+    # Development opt-in: replay identical prompts from disk across runs. Off by
+    # default, since a cached sampled response makes reruns return the same post
+    llm_cache_file = config.get("general", {}).get("llm_cache_file")
+    if llm_cache_file:
+        from langchain_core.globals import set_llm_cache
+        from langchain_community.cache import SQLiteCache
+        
+        set_llm_cache(SQLiteCache(database_path=llm_cache_file))
+        logger.info(f"LLM response cache enabled: {llm_cache_file}")
+    
     # Get topic
     topic = args.topic or config.get("general", {}).get("default_topic")
     if not topic:
@@ -109,30 +167,50 @@ def main():
     
     logger.info(f"Topic: {topic}")
     
+    editor = None
     try:
         # Initialize language models for each agent
         logger.info("Initializing language models...")
         
         researcher_config = config.get("researcher", {})
-        researcher_llm = initialize_llm(
-            researcher_config.get("model", "gpt-4o"),
-            temperature=researcher_config.get("temperature", 0.7),
-            max_output_tokens=researcher_config.get("max_output_tokens", 4000)
-        )
-        
         drafter_config = config.get("drafter", {})
-        drafter_llm = initialize_llm(
-            drafter_config.get("model", "gpt-4o"),
-            temperature=drafter_config.get("temperature", 0.8),
-            max_output_tokens=drafter_config.get("max_output_tokens", 3000)
-        )
-        
         editor_config = config.get("editor_in_chief", {})
-        editor_llm = initialize_llm(
-            editor_config.get("model", "gpt-4o"),
-            temperature=editor_config.get("temperature", 0.7),
-            max_output_tokens=editor_config.get("max_output_tokens", 4000)
-        )
+        
+        # (agent config, default temperature, default max_output_tokens)
+        llm_specs = {
+            "researcher": (researcher_config, 0.7, 4000),
+            "drafter": (drafter_config, 0.8, 3000),
+            "editor": (editor_config, 0.7, 4000),
+        }
+        
+        # Client setup is I/O-bound, so initialize all three models concurrently
+        llms = {}
+        failed = {}
+        with ThreadPoolExecutor(max_workers=len(llm_specs)) as executor:
+            futures = {
+                executor.submit(
+                    initialize_llm,
+                    agent_config.get("model", "gpt-4o"),
+                    temperature=agent_config.get("temperature", default_temperature),
+                    max_output_tokens=agent_config.get("max_output_tokens", default_max_tokens)
+                ): name
+                for name, (agent_config, default_temperature, default_max_tokens) in llm_specs.items()
+            }
+            
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    llms[name] = future.result()
+                except Exception as e:
+                    logger.error(f"Failed to initialize {name} model: {str(e)}")
+                    failed[name] = e
+        
+        if failed:
+            raise next(iter(failed.values()))
+        
+        researcher_llm = llms["researcher"]
+        drafter_llm = llms["drafter"]
+        editor_llm = llms["editor"]
         
         logger.info("Language models initialized successfully")
         
@@ -150,10 +228,12 @@ def main():
         logger.info("Initializing workflow...")
         
         max_iterations = config.get("general", {}).get("max_total_iterations", 10)
-        workflow = InstagramWorkflow(researcher, drafter, editor, max_iterations)
+        fuse_first_review = config.get("general", {}).get("fuse_first_review", False)
+        workflow = InstagramWorkflow(researcher, drafter, editor, max_iterations, fuse_first_review)
         
         logger.info("Starting workflow execution...")
-        result = workflow.run(topic)
+        # The async run drafts and searches research revisions concurrently
+        result = asyncio.run(workflow.arun(topic))
         
         # Display final post
         final_post = result.get("final_post", {})
@@ -175,6 +255,10 @@ def main():
         logger.error(f"Error during workflow execution: {str(e)}", exc_info=True)
         print(f"\n❌ Error: {str(e)}")
         sys.exit(1)
+    
+    finally:
+        if editor is not None:
+            editor.close()
 
 
 if __name__ == "__main__":
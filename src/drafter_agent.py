@@ -3,13 +3,47 @@ Drafter Agent for Instagram Post Creation
 Creates Instagram carousel posts with proper layout and formatting.
 """
 
-import json
+import asyncio
+import io
 import logging
-from typing import Dict, Any, List
-from langchain_core.messages import HumanMessage, SystemMessage
+import operator
+import re
+from typing import Dict, Any, Iterator, List, TypedDict
+import orjson
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from langchain_core.output_parsers import JsonOutputParser
+from langchain_core.utils.function_calling import convert_to_json_schema
 from src.style_vault_parser import StyleVaultParser
 
 
+logger = logging.getLogger(__name__)
+
+# Body of the first ``` or ```json fenced block in a model response
+_JSON_FENCE_RE = re.compile(r"```(?:json)?\s*(.+?)\s*```", re.DOTALL)
+
+# Slide fields in display order, fetched in one call for complete slides
+_SLIDE_KEYS = frozenset(("page_number", "title", "content", "layout"))
+_slide_fields = operator.itemgetter("page_number", "title", "content", "layout")
+
+
+class Slide(TypedDict):
+    """A single slide of an Instagram carousel post."""
+    page_number: int
+    title: str
+    content: str
+    layout: str
+
+
+class Post(TypedDict):
+    """An Instagram carousel post made of ordered slides."""
+    slides: List[Slide]
+
+
+class Outline(TypedDict):
+    """Ordered slide titles planned before slides are written in parallel."""
+    titles: List[str]
+
+
 class DrafterAgent:
     """Agent responsible for drafting Instagram carousel posts."""
     
@@ -25,7 +59,32 @@ class DrafterAgent:
         self.llm = llm
         self.max_slides = config.get("max_slides", 10)
         self.instructions = config.get("instructions", "")
-        self.logger = logging.getLogger(__name__)
+        self._system_message = SystemMessage(content=self.instructions)
+        
+        # Cap the slide array in the schema itself so the provider stops
+        # generating at max_slides instead of producing slides we truncate
+        self.post_schema = convert_to_json_schema(Post)
+        self.post_schema["properties"]["slides"]["maxItems"] = self.max_slides
+        
+        # Let the provider enforce the post schema when the model supports it;
+        # otherwise fall back to parsing JSON out of the raw response
+        try:
+            self.structured_llm = llm.with_structured_output(self.post_schema, include_raw=True)
+        except NotImplementedError:
+            logger.info("Structured output not supported by model, using JSON parsing")
+            self.structured_llm = None
+        
+        # Optionally plan the slide titles first and write slides concurrently;
+        # only adraft_post (the workflow's async path) reads this
+        self.parallel_slides = config.get("parallel_slides", False)
+        self.slide_concurrency = config.get("slide_concurrency", 5)
+        self.outline_llm = None
+        self.slide_llm = None
+        if self.parallel_slides and self.structured_llm is not None:
+            outline_schema = convert_to_json_schema(Outline)
+            outline_schema["properties"]["titles"]["maxItems"] = self.max_slides
+            self.outline_llm = llm.with_structured_output(outline_schema, include_raw=True)
+            self.slide_llm = llm.with_structured_output(convert_to_json_schema(Slide), include_raw=True)
         
         # Style vault configuration
         self.use_style_vault = config.get("use_style_vault", False)
@@ -35,39 +94,24 @@ class DrafterAgent:
         if self.use_style_vault:
             try:
                 self.style_vault_parser = StyleVaultParser(self.style_vault_file)
-                self.logger.info(f"Style vault enabled: {self.style_vault_file}")
+                logger.info("Style vault enabled: %s", self.style_vault_file)
             except Exception as e:
-                self.logger.warning(f"Failed to initialize style vault: {str(e)}")
+                logger.warning("Failed to initialize style vault: %s", e)
                 self.use_style_vault = False
         
-    def draft_post(self, research_data: Dict[str, Any], revision_feedback: str = None) -> Dict[str, Any]:
+    def build_messages(self, research_data: Dict[str, Any], revision_feedback: str = None) -> List[BaseMessage]:
         """
-        Draft an Instagram carousel post based on research data.
+        Build the prompt messages for drafting a post.
         
         Args:
             research_data: Research content to base the post on
             revision_feedback: Optional feedback for revisions
             
         Returns:
-            Dictionary containing the drafted post with slides
+            List of messages to send to the language model
         """
-        self.logger.info(f"Drafting Instagram post for topic: {research_data.get('topic', 'Unknown')}")
-        
-        system_message = SystemMessage(content=self.instructions)
-        
-        revision_note = ""
-        if revision_feedback:
-            revision_note = f"\n\n**IMPORTANT REVISION FEEDBACK:**\n{revision_feedback}\n\nPlease address this feedback in your revised draft."
-        
-        # Load style examples if enabled
-        style_examples = ""
-        if self.use_style_vault and self.style_vault_parser:
-            try:
-                style_examples = "\n\n**STYLE REFERENCE:**\nUse the following examples as style references for tone, structure, and formatting:\n\n"
-                style_examples += self.style_vault_parser.get_style_examples_for_prompt(limit=2)
-            except Exception as e:
-                self.logger.warning(f"Failed to load style examples: {str(e)}")
-                style_examples = ""
+        revision_note = self._revision_note(revision_feedback)
+        style_examples = self._style_examples()
         
         human_message = HumanMessage(
             content=f"""Create an engaging Instagram carousel post (maximum {self.max_slides} slides) based on the following research.
@@ -105,83 +149,292 @@ Format your response as a valid JSON object with this structure:
 Ensure the JSON is valid and complete."""
         )
         
-        messages = [system_message, human_message]
-        response = self.llm.invoke(messages)
+        return [self._system_message, human_message]
+    
+    @staticmethod
+    def _revision_note(revision_feedback: str = None) -> str:
+        """Prompt section asking the model to address revision feedback."""
+        if not revision_feedback:
+            return ""
+        return f"\n\n**IMPORTANT REVISION FEEDBACK:**\n{revision_feedback}\n\nPlease address this feedback in your revised draft."
+    
+    def _style_examples(self) -> str:
+        """Prompt section with style vault examples, if enabled."""
+        if not (self.use_style_vault and self.style_vault_parser):
+            return ""
+        try:
+            style_examples = "\n\n**STYLE REFERENCE:**\nUse the following examples as style references for tone, structure, and formatting:\n\n"
+            return style_examples + self.style_vault_parser.get_style_examples_for_prompt(limit=2)
+        except Exception as e:
+            logger.warning("Failed to load style examples: %s", e)
+            return ""
+    
+    def _build_outline_messages(self, research_data: Dict[str, Any], revision_feedback: str = None) -> List[BaseMessage]:
+        """Build the prompt that plans the slide titles of a post."""
+        human_message = HumanMessage(
+            content=f"""Plan an engaging Instagram carousel post (maximum {self.max_slides} slides) based on the following research.
+
+Topic: {research_data.get('topic', 'N/A')}
+
+Research Content:
+{research_data.get('research_content', 'N/A')}
+{self._revision_note(revision_feedback)}
+
+List one title per slide, in order. The first slide must give a clear definition and the last must be an engaging call-to-action. Every slide must have a clear purpose and provide intermediate to advanced value for data science professionals with 2-3 years of experience.
+
+Format your response as a valid JSON object with this structure:
+{{
+  "titles": ["Title of slide 1", "Title of slide 2"]
+}}"""
+        )
+        
+        return [self._system_message, human_message]
+    
+    def _build_slide_messages(self, research_data: Dict[str, Any], titles: List[str], page_number: int,
+                              revision_feedback: str = None) -> List[BaseMessage]:
+        """Build the prompt that writes one slide of a planned post."""
+        outline = "\n".join(f"{idx}. {title}" for idx, title in enumerate(titles, start=1))
         
-        response_content = response.content if hasattr(response, 'content') else str(response)
+        human_message = HumanMessage(
+            content=f"""Write slide {page_number} of {len(titles)} of an Instagram carousel post based on the following research.
+
+Topic: {research_data.get('topic', 'N/A')}
+
+Research Content:
+{research_data.get('research_content', 'N/A')}
+{self._style_examples()}
+{self._revision_note(revision_feedback)}
+
+Post outline:
+{outline}
+
+Write only slide {page_number}: "{titles[page_number - 1]}". Keep it concise, use **bold** for key terms, avoid repeating other slides and include @learningalgorithm.
+
+Format your response as a valid JSON object with this structure:
+{{
+  "page_number": {page_number},
+  "title": "Title of the slide",
+  "content": "Main content of the slide",
+  "layout": "Description of visual layout"
+}}"""
+        )
+        
+        return [self._system_message, human_message]
+    
+    @staticmethod
+    def _parse_json(response_content: str) -> Any:
+        """Parse JSON from a model response, unwrapping a markdown code block if present."""
+        fence = _JSON_FENCE_RE.search(response_content)
+        json_str = fence.group(1) if fence else response_content.strip()
+        return orjson.loads(json_str)
+    
+    async def _agenerate(self, messages: List[BaseMessage], structured_llm) -> Any:
+        """Generate a JSON object with structured output, or by parsing the raw response."""
+        if structured_llm is not None:
+            structured_response = await structured_llm.ainvoke(messages)
+            if structured_response["parsing_error"] is not None:
+                raise structured_response["parsing_error"]
+            return structured_response["parsed"]
         
-        # Parse the JSON response
+        response = await self.llm.ainvoke(messages)
+        return self._parse_json(response.content)
+    
+    def _error_post(self, research_data: Dict[str, Any], content: str, error: Exception) -> Dict[str, Any]:
+        """Fallback post returned when drafting fails."""
+        return {
+            "topic": research_data.get('topic'),
+            "post": {
+                "slides": [
+                    {
+                        "page_number": 1,
+                        "title": "Error",
+                        "content": content,
+                        "layout": "Error message"
+                    }
+                ]
+            },
+            "slide_count": 1,
+            "error": str(error)
+        }
+    
+    def draft_post(self, research_data: Dict[str, Any], revision_feedback: str = None) -> Dict[str, Any]:
+        """
+        Draft an Instagram carousel post based on research data.
+        
+        Args:
+            research_data: Research content to base the post on
+            revision_feedback: Optional feedback for revisions
+            
+        Returns:
+            Dictionary containing the drafted post with slides
+        """
+        logger.info("Drafting Instagram post for topic: %s", research_data.get('topic', 'Unknown'))
+        
+        messages = self.build_messages(research_data, revision_feedback)
+        
+        if self.structured_llm is not None:
+            structured_response = self.structured_llm.invoke(messages)
+        else:
+            response = self.llm.invoke(messages)
+            response_content = response.content
+        
+        # Parse the response
         try:
-            # Try to extract JSON from markdown code blocks if present
-            if "```json" in response_content:
-                json_start = response_content.find("```json") + 7
-                json_end = response_content.find("```", json_start)
-                json_str = response_content[json_start:json_end].strip()
-            elif "```" in response_content:
-                json_start = response_content.find("```") + 3
-                json_end = response_content.find("```", json_start)
-                json_str = response_content[json_start:json_end].strip()
+            if self.structured_llm is not None:
+                if structured_response["parsing_error"] is not None:
+                    raise structured_response["parsing_error"]
+                post_data = structured_response["parsed"]
             else:
-                json_str = response_content.strip()
+                post_data = self._parse_json(response_content)
             
-            post_data = json.loads(json_str)
+            return self.package_post(research_data, post_data)
             
-            # Validate the structure
-            if "slides" not in post_data:
-                raise ValueError("Response does not contain 'slides' key")
+        except orjson.JSONDecodeError as e:
+            logger.error("Failed to parse JSON response: %s", e)
+            logger.error("Response content: %s", response_content)
             
-            if len(post_data["slides"]) > self.max_slides:
-                self.logger.warning(f"Post has {len(post_data['slides'])} slides, truncating to {self.max_slides}")
-                post_data["slides"] = post_data["slides"][:self.max_slides]
-                # Renumber slides to be sequential
-                for idx, slide in enumerate(post_data["slides"], start=1):
-                    slide["page_number"] = idx
+            # Return a fallback structure
+            return self._error_post(research_data, f"Failed to generate post. Error: {str(e)}", e)
+        except Exception as e:
+            logger.error("Unexpected error during drafting: %s", e)
+            return self._error_post(research_data, f"Unexpected error: {str(e)}", e)
+    
+    async def adraft_post(self, research_data: Dict[str, Any], revision_feedback: str = None) -> Dict[str, Any]:
+        """
+        Async variant of draft_post.
+        
+        With parallel_slides enabled, the slide titles are planned first and
+        each slide is then written by its own concurrent LLM call, bounded by
+        slide_concurrency. Otherwise the whole post is drafted in one call.
+        
+        Args:
+            research_data: Research content to base the post on
+            revision_feedback: Optional feedback for revisions
             
-            self.logger.info(f"Successfully drafted post with {len(post_data['slides'])} slides")
+        Returns:
+            Dictionary containing the drafted post with slides
+        """
+        logger.info("Drafting Instagram post for topic: %s", research_data.get('topic', 'Unknown'))
+        
+        try:
+            if self.parallel_slides:
+                post_data = await self._adraft_slides(research_data, revision_feedback)
+            else:
+                post_data = await self._agenerate(
+                    self.build_messages(research_data, revision_feedback), self.structured_llm
+                )
             
-            return {
-                "topic": research_data.get('topic'),
-                "post": post_data,
-                "slide_count": len(post_data["slides"])
-            }
+            return self.package_post(research_data, post_data)
+        
+        except orjson.JSONDecodeError as e:
+            logger.error("Failed to parse JSON response: %s", e)
+            return self._error_post(research_data, f"Failed to generate post. Error: {str(e)}", e)
+        except Exception as e:
+            logger.error("Unexpected error during drafting: %s", e)
+            return self._error_post(research_data, f"Unexpected error: {str(e)}", e)
+    
+    async def _adraft_slides(self, research_data: Dict[str, Any], revision_feedback: str = None) -> Dict[str, Any]:
+        """Plan slide titles, then write every slide concurrently."""
+        outline = await self._agenerate(
+            self._build_outline_messages(research_data, revision_feedback), self.outline_llm
+        )
+        titles = (outline or {}).get("titles", [])[:self.max_slides]
+        if not titles:
+            raise ValueError("Outline does not contain any slide titles")
+        
+        # Bound the number of in-flight requests to respect provider rate limits
+        semaphore = asyncio.Semaphore(self.slide_concurrency)
+        
+        async def write_slide(page_number: int) -> Dict[str, Any]:
+            async with semaphore:
+                slide = await self._agenerate(
+                    self._build_slide_messages(research_data, titles, page_number, revision_feedback),
+                    self.slide_llm
+                )
+            slide["page_number"] = page_number
+            slide.setdefault("title", titles[page_number - 1])
+            return slide
+        
+        slides = await asyncio.gather(*(write_slide(idx) for idx in range(1, len(titles) + 1)))
+        return {"slides": list(slides)}
+    
+    def package_post(self, research_data: Dict[str, Any], post_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Validate a generated post and wrap it with its metadata.
+        
+        Args:
+            research_data: Research the post was drafted from
+            post_data: Generated post containing a 'slides' list
             
-        except json.JSONDecodeError as e:
-            self.logger.error(f"Failed to parse JSON response: {str(e)}")
-            self.logger.error(f"Response content: {response_content}")
+        Returns:
+            Dictionary containing the drafted post with slides
             
-            # Return a fallback structure
-            return {
-                "topic": research_data.get('topic'),
-                "post": {
-                    "slides": [
-                        {
-                            "page_number": 1,
-                            "title": "Error",
-                            "content": f"Failed to generate post. Error: {str(e)}",
-                            "layout": "Error message"
-                        }
-                    ]
-                },
-                "slide_count": 1,
-                "error": str(e)
-            }
-        except Exception as e:
-            self.logger.error(f"Unexpected error during drafting: {str(e)}")
-            return {
-                "topic": research_data.get('topic'),
-                "post": {
-                    "slides": [
-                        {
-                            "page_number": 1,
-                            "title": "Error",
-                            "content": f"Unexpected error: {str(e)}",
-                            "layout": "Error message"
-                        }
-                    ]
-                },
-                "slide_count": 1,
-                "error": str(e)
-            }
+        Raises:
+            ValueError: If the post has no slides
+        """
+        # Validate the structure
+        if not post_data or "slides" not in post_data:
+            raise ValueError("Response does not contain 'slides' key")
+        
+        # Not every provider honors maxItems, so still guard the limit
+        if len(post_data["slides"]) > self.max_slides:
+            logger.warning("Post has %s slides, truncating to %s", len(post_data['slides']), self.max_slides)
+            post_data["slides"] = post_data["slides"][:self.max_slides]
+            # Renumber slides to be sequential
+            for idx, slide in enumerate(post_data["slides"], start=1):
+                slide["page_number"] = idx
+        
+        logger.info("Successfully drafted post with %s slides", len(post_data['slides']))
+        
+        result = {
+            "topic": research_data.get('topic'),
+            "post": post_data,
+            "slide_count": len(post_data["slides"])
+        }
+        # Rendered once per draft so every review of it can reuse the text
+        result["_display"] = self.format_post_for_display(result)
+        
+        return result
+    
+    def stream_slides(self, research_data: Dict[str, Any], revision_feedback: str = None) -> Iterator[Dict[str, Any]]:
+        """
+        Stream the slides of a new draft as the model generates them.
+        
+        Each slide is yielded as soon as the model moves on to the next one, so
+        display-only callers can show the first slide long before the full
+        response is finished. Generation stops once max_slides have been yielded.
+        
+        Args:
+            research_data: Research content to base the post on
+            revision_feedback: Optional feedback for revisions
+            
+        Yields:
+            Slide dictionaries in page order
+        """
+        logger.info("Streaming Instagram post for topic: %s", research_data.get('topic', 'Unknown'))
+        
+        messages = self.build_messages(research_data, revision_feedback)
+        
+        # Both runnables emit the cumulative, partially parsed JSON object
+        if self.structured_llm is not None:
+            stream_llm = self.llm.with_structured_output(self.post_schema)
+        else:
+            stream_llm = self.llm | JsonOutputParser()
+        
+        emitted = 0
+        slides = []
+        for partial in stream_llm.stream(messages):
+            slides = (partial or {}).get("slides") or []
+            
+            # A slide is complete once the model has started the next one
+            while emitted < len(slides) - 1:
+                yield slides[emitted]
+                emitted += 1
+                if emitted >= self.max_slides:
+                    return
+        
+        for slide in slides[emitted:self.max_slides]:
+            yield slide
     
     def format_post_for_display(self, post_data: Dict[str, Any]) -> str:
         """
@@ -196,17 +449,29 @@ Ensure the JSON is valid and complete."""
         if "post" not in post_data:
             return "No post data available"
         
-        output = []
-        output.append(f"\n{'='*60}")
-        output.append(f"INSTAGRAM POST: {post_data.get('topic', 'Unknown Topic')}")
-        output.append(f"Total Slides: {post_data.get('slide_count', 0)}")
-        output.append(f"{'='*60}\n")
+        buffer = io.StringIO()
+        buffer.write(
+            f"\n{'='*60}\n"
+            f"INSTAGRAM POST: {post_data.get('topic', 'Unknown Topic')}\n"
+            f"Total Slides: {post_data.get('slide_count', 0)}\n"
+            f"{'='*60}\n"
+        )
         
         for slide in post_data["post"].get("slides", []):
-            output.append(f"\n--- SLIDE {slide.get('page_number', '?')} ---")
-            output.append(f"Title: {slide.get('title', 'N/A')}")
-            output.append(f"\nContent:\n{slide.get('content', 'N/A')}")
-            output.append(f"\nLayout: {slide.get('layout', 'N/A')}")
-            output.append(f"{'-'*60}")
+            if _SLIDE_KEYS <= slide.keys():
+                page_number, title, content, layout = _slide_fields(slide)
+            else:
+                page_number = slide.get('page_number', '?')
+                title = slide.get('title', 'N/A')
+                content = slide.get('content', 'N/A')
+                layout = slide.get('layout', 'N/A')
+            
+            buffer.write(
+                f"\n\n--- SLIDE {page_number} ---\n"
+                f"Title: {title}\n"
+                f"\nContent:\n{content}\n"
+                f"\nLayout: {layout}\n"
+                f"{'-'*60}"
+            )
         
-        return "\n".join(output)
+        return buffer.getvalue()
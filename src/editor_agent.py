@@ -3,10 +3,56 @@ Editor in Chief Agent - ReAct Agent
 Reviews posts and provides feedback, can invoke researcher and drafter as subagents.
 """
 
-import json
+import asyncio
 import logging
-from typing import Dict, Any, List, Tuple
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Literal, Tuple, TypedDict
+import orjson
 from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.utils.function_calling import convert_to_json_schema
+from src.drafter_agent import Post
+
+
+logger = logging.getLogger(__name__)
+
+# Body of the first ``` or ```json fenced block in a model response
+_JSON_FENCE_RE = re.compile(r"```(?:json)?\s*(.+?)\s*```", re.DOTALL)
+
+
+# Review rubric shared by the standalone review and the fused draft-and-review
+REVIEW_CRITERIA = """Evaluate the post based on:
+1. Quality: Is the content valuable for data science professionals with 2-3 years experience?
+2. Depth: Does it include intermediate or advanced elements (not just beginner content)?
+3. Coherence: Do all slides work together to communicate a unified message?
+4. Value: Is there genuine value with no filler content?
+5. Structure: Does it start with a clear definition and build logically?
+
+Provide your response in the following JSON format:
+{
+  "decision": "approve" or "revise_research" or "revise_draft",
+  "feedback": "Detailed feedback explaining your decision",
+  "specific_issues": ["List of specific issues if revisions needed"],
+  "suggestions": ["Specific suggestions for improvement"]
+}
+
+If you decide "revise_research", include what additional information is needed.
+If you decide "revise_draft", include specific content improvements needed.
+Only "approve" if the post meets premium quality standards."""
+
+
+class Review(TypedDict):
+    """The editor's decision on a drafted post."""
+    decision: Literal["approve", "revise_research", "revise_draft"]
+    feedback: str
+    specific_issues: List[str]
+    suggestions: List[str]
+
+
+class DraftWithReview(TypedDict):
+    """A drafted post together with the editor's review of it."""
+    draft: Post
+    review: Review
 
 
 class EditorInChiefAgent:
@@ -28,7 +74,30 @@ class EditorInChiefAgent:
         self.drafter_agent = drafter_agent
         self.max_iterations = config.get("max_iterations", 5)
         self.instructions = config.get("instructions", "")
-        self.logger = logging.getLogger(__name__)
+        self._system_message = SystemMessage(content=self.instructions)
+        
+        # Let the provider enforce the review schema when the model supports it;
+        # otherwise fall back to parsing JSON out of the raw response
+        try:
+            self.structured_llm = llm.with_structured_output(Review, include_raw=True)
+        except NotImplementedError:
+            logger.info("Structured output not supported by model, using JSON parsing")
+            self.structured_llm = None
+        
+        # Opt-in: re-draft from the current research while a research revision
+        # runs. Costs an extra drafter call per research revision, used only when
+        # the new research fails or comes back unchanged
+        self.speculative_draft = config.get("speculative_draft", False)
+        self._executor = None
+        if self.speculative_draft:
+            self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="editor-subagent")
+        
+        # Draft and review in one call; reuses the drafter's slide-capped schema
+        self.fused_llm = None
+        if self.structured_llm is not None:
+            fused_schema = convert_to_json_schema(DraftWithReview)
+            fused_schema["properties"]["draft"] = drafter_agent.post_schema
+            self.fused_llm = llm.with_structured_output(fused_schema, include_raw=True)
         
     def review_post(self, post_data: Dict[str, Any], research_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -41,12 +110,14 @@ class EditorInChiefAgent:
         Returns:
             Dictionary containing review decision and feedback
         """
-        self.logger.info("Editor reviewing post...")
+        logger.info("Editor reviewing post...")
         
-        # Format post for review
-        post_text = self.drafter_agent.format_post_for_display(post_data)
+        # Format post for review, reusing the drafter's rendering when present
+        post_text = post_data.get("_display") or self.drafter_agent.format_post_for_display(post_data)
         
-        system_message = SystemMessage(content=self.instructions)
+        research_preview = research_data.get("research_preview")
+        if research_preview is None:
+            research_preview = research_data.get('research_content', 'N/A')[:500]
         
         human_message = HumanMessage(
             content=f"""Review the following Instagram post draft for quality and coherence.
@@ -54,64 +125,41 @@ class EditorInChiefAgent:
 Topic: {post_data.get('topic', 'Unknown')}
 
 Research Summary (first 500 chars):
-{research_data.get('research_content', 'N/A')[:500]}...
+{research_preview}...
 
 Post to Review:
 {post_text}
 
-Evaluate the post based on:
-1. Quality: Is the content valuable for data science professionals with 2-3 years experience?
-2. Depth: Does it include intermediate or advanced elements (not just beginner content)?
-3. Coherence: Do all slides work together to communicate a unified message?
-4. Value: Is there genuine value with no filler content?
-5. Structure: Does it start with a clear definition and build logically?
-
-Provide your response in the following JSON format:
-{{
-  "decision": "approve" or "revise_research" or "revise_draft",
-  "feedback": "Detailed feedback explaining your decision",
-  "specific_issues": ["List of specific issues if revisions needed"],
-  "suggestions": ["Specific suggestions for improvement"]
-}}
-
-If you decide "revise_research", include what additional information is needed.
-If you decide "revise_draft", include specific content improvements needed.
-Only "approve" if the post meets premium quality standards."""
+{REVIEW_CRITERIA}"""
         )
         
-        messages = [system_message, human_message]
-        response = self.llm.invoke(messages)
+        messages = [self._system_message, human_message]
         
-        response_content = response.content if hasattr(response, 'content') else str(response)
+        if self.structured_llm is not None:
+            structured_response = self.structured_llm.invoke(messages)
+        else:
+            response = self.llm.invoke(messages)
+            response_content = response.content
         
-        # Parse the JSON response
+        # Parse the response
         try:
-            # Extract JSON from markdown code blocks if present
-            if "```json" in response_content:
-                json_start = response_content.find("```json") + 7
-                json_end = response_content.find("```", json_start)
-                json_str = response_content[json_start:json_end].strip()
-            elif "```" in response_content:
-                json_start = response_content.find("```") + 3
-                json_end = response_content.find("```", json_start)
-                json_str = response_content[json_start:json_end].strip()
+            if self.structured_llm is not None:
+                if structured_response["parsing_error"] is not None:
+                    raise structured_response["parsing_error"]
+                review_result = structured_response["parsed"]
+                if not review_result:
+                    raise ValueError("Model did not return a review")
             else:
-                json_str = response_content.strip()
-            
-            review_result = json.loads(json_str)
-            
-            # Validate decision
-            valid_decisions = ["approve", "revise_research", "revise_draft"]
-            if review_result.get("decision") not in valid_decisions:
-                self.logger.warning(f"Invalid decision: {review_result.get('decision')}, defaulting to revise_draft")
-                review_result["decision"] = "revise_draft"
-            
-            self.logger.info(f"Review decision: {review_result.get('decision')}")
+                # Extract JSON from a markdown code block if present
+                fence = _JSON_FENCE_RE.search(response_content)
+                json_str = fence.group(1) if fence else response_content.strip()
+                
+                review_result = orjson.loads(json_str)
             
-            return review_result
+            return self._validate_review(review_result)
             
-        except json.JSONDecodeError as e:
-            self.logger.error(f"Failed to parse review response: {str(e)}")
+        except orjson.JSONDecodeError as e:
+            logger.error("Failed to parse review response: %s", e)
             # Default to requesting revision
             return {
                 "decision": "revise_draft",
@@ -120,7 +168,7 @@ Only "approve" if the post meets premium quality standards."""
                 "suggestions": ["Ensure content meets quality standards"]
             }
         except Exception as e:
-            self.logger.error(f"Unexpected error during review: {str(e)}")
+            logger.error("Unexpected error during review: %s", e)
             return {
                 "decision": "revise_draft",
                 "feedback": f"Error during review: {str(e)}",
@@ -128,6 +176,75 @@ Only "approve" if the post meets premium quality standards."""
                 "suggestions": []
             }
     
+    def draft_and_review(self, research_data: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Draft a post and review it in a single LLM call.
+        
+        The drafter's prompt is extended with the review rubric and the model
+        returns both the post and its review, saving one round-trip and the
+        re-sent draft tokens. Falls back to separate draft and review calls when
+        the model lacks structured output or the fused response fails to parse.
+        
+        Args:
+            research_data: Research content to base the post on
+            
+        Returns:
+            Tuple of (post_data, review_decision)
+        """
+        if self.fused_llm is not None:
+            logger.info("Editor drafting and reviewing post in one pass...")
+            
+            system_message, draft_message = self.drafter_agent.build_messages(research_data)
+            human_message = HumanMessage(
+                content=f"""{draft_message.content}
+
+After drafting, act as the Editor in Chief and critically review your own draft.
+
+{self.instructions}
+
+{REVIEW_CRITERIA}
+
+Return the post as "draft" and your review as "review"."""
+            )
+            
+            result = self.fused_llm.invoke([system_message, human_message])
+            
+            try:
+                if result["parsing_error"] is not None:
+                    raise result["parsing_error"]
+                fused = result["parsed"]
+                if not fused or "review" not in fused:
+                    raise ValueError("Model did not return a draft and review")
+                
+                post_data = self.drafter_agent.package_post(research_data, fused.get("draft"))
+                return post_data, self._validate_review(fused["review"])
+                
+            except Exception as e:
+                logger.warning("Fused draft and review failed (%s), falling back to separate calls", e)
+        
+        post_data = self.drafter_agent.draft_post(research_data)
+        return post_data, self.review_post(post_data, research_data)
+    
+    def _validate_review(self, review_result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Ensure a review carries a known decision.
+        
+        Args:
+            review_result: Parsed review from the model
+            
+        Returns:
+            The review, with an invalid decision replaced by revise_draft
+        """
+        # Validate decision
+        valid_decisions = ["approve", "revise_research", "revise_draft"]
+        if review_result.get("decision") not in valid_decisions:
+            logger.warning("Invalid decision: %s, defaulting to revise_draft", review_result.get('decision'))
+            review_result["decision"] = "revise_draft"
+        
+        logger.info("Review decision: %s", review_result.get('decision'))
+        
+        return review_result
+    
     def execute_action(self, review_decision: Dict[str, Any], research_data: Dict[str, Any], 
                       post_data: Dict[str, Any], topic: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
         """
@@ -147,16 +264,41 @@ Only "approve" if the post meets premium quality standards."""
         suggestions = review_decision.get("suggestions", [])
         
         if decision == "approve":
-            self.logger.info("Post approved by editor!")
+            logger.info("Post approved by editor!")
             return research_data, post_data
         
         elif decision == "revise_research":
-            self.logger.info("Editor requesting research revision...")
+            logger.info("Editor requesting research revision...")
             # Extract focus areas from feedback
             focus_areas = " ".join(suggestions) if suggestions else feedback
             
-            # Request additional research
-            updated_research = self.researcher_agent.research(topic, focus_areas=focus_areas)
+            if not self.speculative_draft:
+                updated_research = self.researcher_agent.research(topic, focus_areas=focus_areas)
+                updated_post = self.drafter_agent.draft_post(updated_research)
+                return updated_research, updated_post
+            
+            # Speculatively re-draft from the current research while the new
+            # research runs, so a failed research call still yields a revision
+            research_future = self._executor.submit(
+                self.researcher_agent.research, topic, focus_areas=focus_areas
+            )
+            speculative_future = self._executor.submit(
+                self.drafter_agent.draft_post, research_data,
+                revision_feedback=self._build_revision_feedback(feedback, suggestions)
+            )
+            
+            try:
+                updated_research = research_future.result()
+            except Exception as e:
+                logger.warning("Research revision failed (%s), using speculative draft", e)
+                return research_data, speculative_future.result()
+            
+            if self._research_unchanged(research_data, updated_research):
+                logger.info("Research unchanged, using speculative draft")
+                return research_data, speculative_future.result()
+            
+            # New research supersedes the speculative draft
+            speculative_future.cancel()
             
             # Re-draft with updated research
             updated_post = self.drafter_agent.draft_post(updated_research)
@@ -164,9 +306,9 @@ Only "approve" if the post meets premium quality standards."""
             return updated_research, updated_post
         
         elif decision == "revise_draft":
-            self.logger.info("Editor requesting draft revision...")
+            logger.info("Editor requesting draft revision...")
             # Create revision feedback
-            revision_feedback = f"{feedback}\n\nSpecific suggestions:\n" + "\n".join(f"- {s}" for s in suggestions)
+            revision_feedback = self._build_revision_feedback(feedback, suggestions)
             
             # Re-draft with feedback
             updated_post = self.drafter_agent.draft_post(research_data, revision_feedback=revision_feedback)
@@ -174,5 +316,90 @@ Only "approve" if the post meets premium quality standards."""
             return research_data, updated_post
         
         else:
-            self.logger.warning(f"Unknown decision: {decision}, no action taken")
+            logger.warning("Unknown decision: %s, no action taken", decision)
             return research_data, post_data
+    
+    async def aexecute_action(self, review_decision: Dict[str, Any], research_data: Dict[str, Any],
+                              post_data: Dict[str, Any], topic: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Async variant of execute_action.
+        
+        Drafts use the drafter's async path. For a research revision each
+        suggestion becomes its own focus area, so the researcher searches them
+        concurrently, alongside the speculative draft when that is enabled.
+        
+        Args:
+            review_decision: The review decision and feedback
+            research_data: Current research data
+            post_data: Current post data
+            topic: The topic being covered
+            
+        Returns:
+            Tuple of (updated_research_data, updated_post_data)
+        """
+        decision = review_decision.get("decision")
+        if decision == "revise_draft":
+            logger.info("Editor requesting draft revision...")
+            revision_feedback = self._build_revision_feedback(
+                review_decision.get("feedback", ""), review_decision.get("suggestions", [])
+            )
+            updated_post = await self.drafter_agent.adraft_post(research_data, revision_feedback=revision_feedback)
+            return research_data, updated_post
+        
+        if decision != "revise_research":
+            return self.execute_action(review_decision, research_data, post_data, topic)
+        
+        logger.info("Editor requesting research revision...")
+        feedback = review_decision.get("feedback", "")
+        suggestions = review_decision.get("suggestions", [])
+        # aresearch fans out on commas, so keep each suggestion in one piece
+        focus_areas = ", ".join(s.replace(",", " ") for s in suggestions) if suggestions else feedback
+        
+        if not self.speculative_draft:
+            updated_research = await self.researcher_agent.aresearch(topic, focus_areas=focus_areas)
+            updated_post = await self.drafter_agent.adraft_post(updated_research)
+            return updated_research, updated_post
+        
+        speculative_task = asyncio.create_task(self.drafter_agent.adraft_post(
+            research_data, revision_feedback=self._build_revision_feedback(feedback, suggestions)
+        ))
+        
+        try:
+            updated_research = await self.researcher_agent.aresearch(topic, focus_areas=focus_areas)
+        except Exception as e:
+            logger.warning("Research revision failed (%s), using speculative draft", e)
+            return research_data, await speculative_task
+        
+        if self._research_unchanged(research_data, updated_research):
+            logger.info("Research unchanged, using speculative draft")
+            return research_data, await speculative_task
+        
+        # New research supersedes the speculative draft
+        speculative_task.cancel()
+        
+        updated_post = await self.drafter_agent.adraft_post(updated_research)
+        
+        return updated_research, updated_post
+    
+    @staticmethod
+    def _research_unchanged(research_data: Dict[str, Any], updated_research: Dict[str, Any]) -> bool:
+        """Whether a research revision returned the same content as before."""
+        return updated_research.get("research_content") == research_data.get("research_content")
+    
+    def _build_revision_feedback(self, feedback: str, suggestions: List[str]) -> str:
+        """
+        Combine editor feedback and suggestions into drafter revision notes.
+        
+        Args:
+            feedback: The editor's overall feedback
+            suggestions: Specific suggestions for improvement
+            
+        Returns:
+            Revision feedback string for the drafter
+        """
+        return f"{feedback}\n\nSpecific suggestions:\n" + "\n".join(f"- {s}" for s in suggestions)
+    
+    def close(self):
+        """Release the subagent thread pool without waiting on speculative work."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
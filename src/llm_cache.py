@@ -0,0 +1,92 @@
+"""
+In-memory prompt cache with optional fuzzy key matching.
+Lets agents reuse earlier results for repeated requests within a run.
+"""
+
+import hashlib
+import math
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def _vectorize(text: str) -> Counter:
+    """Bag-of-words vector of the lowercased alphanumeric tokens in text."""
+    return Counter(_TOKEN_RE.findall(text.lower()))
+
+
+def _cosine(a: Counter, b: Counter) -> float:
+    """Cosine similarity between two bag-of-words vectors."""
+    dot = sum(count * b[token] for token, count in a.items())
+    if not dot:
+        return 0.0
+    norm_a = math.sqrt(sum(c * c for c in a.values()))
+    norm_b = math.sqrt(sum(c * c for c in b.values()))
+    return dot / (norm_a * norm_b)
+
+
+class PromptCache:
+    """Cache keyed on request text, with an opt-in cosine-similarity fallback."""
+
+    def __init__(self, similarity_threshold: float = 1.0):
+        """
+        Initialize the cache.
+
+        Args:
+            similarity_threshold: Minimum cosine similarity for a fuzzy hit.
+                1.0 (the default) disables fuzzy matching; the bag-of-words
+                vectors ignore word order, so e.g. a negated request can
+                match the original.
+        """
+        self.similarity_threshold = similarity_threshold
+        self._exact: Dict[str, Any] = {}
+        self._index: List[Tuple[Counter, str]] = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _digest(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get(self, text: str) -> Optional[Any]:
+        """
+        Look up a cached value for text.
+
+        Args:
+            text: Request text used as the cache key
+
+        Returns:
+            The cached value, or None on a miss
+        """
+        with self._lock:
+            value = self._exact.get(self._digest(text))
+            if value is not None or self.similarity_threshold >= 1.0:
+                return value
+
+            vector = _vectorize(text)
+            best_score, best_digest = 0.0, None
+            for cached_vector, digest in self._index:
+                score = _cosine(vector, cached_vector)
+                if score > best_score:
+                    best_score, best_digest = score, digest
+
+            if best_digest is not None and best_score >= self.similarity_threshold:
+                return self._exact[best_digest]
+            return None
+
+    def set(self, text: str, value: Any) -> None:
+        """
+        Store a value for text.
+
+        Args:
+            text: Request text used as the cache key
+            value: Value to cache
+        """
+        digest = self._digest(text)
+        with self._lock:
+            if digest not in self._exact:
+                self._index.append((_vectorize(text), digest))
+            self._exact[digest] = value
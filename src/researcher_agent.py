@@ -3,11 +3,20 @@ Researcher Agent for Instagram Post Creation
 Uses Tavily API to search and gather information on a given topic.
 """
 
+import asyncio
 import json
 import logging
-from typing import Dict, Any
-from tavily import TavilyClient
-from langchain_core.messages import HumanMessage, SystemMessage
+import re
+from typing import TYPE_CHECKING, Dict, Any, List
+from src.llm_cache import PromptCache
+
+# tavily and langchain_core are imported where used; together they add
+# several hundred milliseconds to importing this module
+if TYPE_CHECKING:
+    from tavily import AsyncTavilyClient
+
+
+_WORD_RE = re.compile(r"\S+")
 
 
 class ResearcherAgent:
@@ -24,9 +33,14 @@ class ResearcherAgent:
         """
         self.config = config
         self.llm = llm
+        from tavily import TavilyClient
+        
+        self.tavily_api_key = tavily_api_key
         self.tavily_client = TavilyClient(api_key=tavily_api_key)
         self.word_limit = config.get("word_limit", 2500)
         self.instructions = config.get("instructions", "")
+        # Revision cycles often re-request research the agent already did
+        self.cache = PromptCache(config.get("cache_similarity", 1.0))
         self.logger = logging.getLogger(__name__)
         
     def search_topic(self, topic: str, focus_areas: str = None) -> str:
@@ -54,36 +68,60 @@ class ResearcherAgent:
                 max_results=10
             )
             
-            # Format search results
-            formatted_results = []
-            for result in search_results.get('results', []):
-                formatted_results.append(f"Title: {result.get('title', 'N/A')}\n"
-                                       f"Content: {result.get('content', 'N/A')}\n"
-                                       f"URL: {result.get('url', 'N/A')}\n")
-            
-            return "\n---\n".join(formatted_results)
+            return self._format_results(search_results)
         
         except Exception as e:
             self.logger.error(f"Error during Tavily search: {str(e)}")
             return f"Search error: {str(e)}"
     
-    def research(self, topic: str, focus_areas: str = None) -> Dict[str, Any]:
+    async def asearch_topic(self, client: "AsyncTavilyClient", topic: str,
+                            focus_areas: str = None, max_results: int = 10) -> str:
         """
-        Conduct research on a topic and synthesize information.
+        Async variant of search_topic using Tavily's async client.
         
         Args:
-            topic: The topic to research
+            client: Async Tavily client bound to the running event loop
+            topic: The main topic to research
             focus_areas: Optional specific areas to focus on
+            max_results: Maximum number of results to request
             
         Returns:
-            Dictionary containing research results
+            Search results as a formatted string
         """
-        self.logger.info(f"Starting research on: {topic}")
+        try:
+            query = topic
+            if focus_areas:
+                query = f"{topic} {focus_areas}"
+            
+            self.logger.info(f"Searching for: {query}")
+            
+            search_results = await client.search(
+                query=query,
+                search_depth="advanced",
+                max_results=max_results
+            )
+            
+            return self._format_results(search_results)
         
-        # Search for information
-        search_results = self.search_topic(topic, focus_areas)
+        except Exception as e:
+            self.logger.error(f"Error during Tavily search: {str(e)}")
+            return f"Search error: {str(e)}"
+    
+    @staticmethod
+    def _format_results(search_results: Dict[str, Any]) -> str:
+        """Format a Tavily response as Title/Content/URL blocks."""
+        results = search_results.get('results', ())
+        return "\n---\n".join(
+            f"Title: {result.get('title', 'N/A')}\n"
+            f"Content: {result.get('content', 'N/A')}\n"
+            f"URL: {result.get('url', 'N/A')}\n"
+            for result in results
+        )
+    
+    def _build_messages(self, topic: str, focus_areas: str, search_results: str) -> List:
+        """Build the synthesis prompt for the given search results."""
+        from langchain_core.messages import HumanMessage, SystemMessage
         
-        # Create prompt for LLM to synthesize research
         system_message = SystemMessage(content=self.instructions)
         
         focus_instruction = ""
@@ -107,17 +145,94 @@ Search Results:
 Provide well-structured, informative content that will serve as the foundation for an Instagram educational post."""
         )
         
-        # Get LLM response
-        messages = [system_message, human_message]
-        response = self.llm.invoke(messages)
-        
-        research_content = response.content if hasattr(response, 'content') else str(response)
-        
-        self.logger.info(f"Research completed. Length: {len(research_content.split())} words")
+        return [system_message, human_message]
+    
+    def _package_research(self, topic: str, focus_areas: str, research_content: str) -> Dict[str, Any]:
+        """Wrap synthesized research content in the result dictionary."""
+        # Count words without materializing the list that split() builds
+        word_count = sum(1 for _ in _WORD_RE.finditer(research_content))
+        self.logger.info(f"Research completed. Length: {word_count} words")
         
         return {
             "topic": topic,
             "research_content": research_content,
+            # Pre-sliced summary used by the editor's review prompt
+            "research_preview": research_content[:500],
             "focus_areas": focus_areas,
-            "word_count": len(research_content.split())
+            "word_count": word_count
         }
+    
+    def research(self, topic: str, focus_areas: str = None) -> Dict[str, Any]:
+        """
+        Conduct research on a topic and synthesize information.
+        
+        Args:
+            topic: The topic to research
+            focus_areas: Optional specific areas to focus on
+            
+        Returns:
+            Dictionary containing research results
+        """
+        self.logger.info(f"Starting research on: {topic}")
+        
+        cache_key = f"{topic}\n{focus_areas or ''}"
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            self.logger.info("Reusing cached research")
+            return dict(cached)
+        
+        # Search for information
+        search_results = self.search_topic(topic, focus_areas)
+        
+        # Get LLM response
+        messages = self._build_messages(topic, focus_areas, search_results)
+        response = self.llm.invoke(messages)
+        
+        result = self._package_research(topic, focus_areas, response.content)
+        if not search_results.startswith("Search error"):
+            self.cache.set(cache_key, result)
+        return dict(result)
+    
+    async def aresearch(self, topic: str, focus_areas: str = None) -> Dict[str, Any]:
+        """
+        Async variant of research that searches each focus area concurrently.
+        
+        Comma-separated focus areas are searched in parallel and the results
+        concatenated, so total search latency is that of the slowest query.
+        
+        Args:
+            topic: The topic to research
+            focus_areas: Optional specific areas to focus on
+            
+        Returns:
+            Dictionary containing research results
+        """
+        self.logger.info(f"Starting research on: {topic}")
+        
+        cache_key = f"{topic}\n{focus_areas or ''}"
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            self.logger.info("Reusing cached research")
+            return dict(cached)
+        
+        focus_list = [fa.strip() for fa in (focus_areas or "").split(",") if fa.strip()]
+        # Split the result budget so the prompt stays the same size overall
+        max_results = max(3, 10 // len(focus_list)) if focus_list else 10
+        
+        from tavily import AsyncTavilyClient
+        
+        # A fresh client per call keeps its connection pool on this event loop
+        async with AsyncTavilyClient(api_key=self.tavily_api_key) as client:
+            results = await asyncio.gather(*[
+                self.asearch_topic(client, topic, fa, max_results)
+                for fa in (focus_list or [None])
+            ])
+        search_results = "\n---\n".join(results)
+        
+        messages = self._build_messages(topic, focus_areas, search_results)
+        response = await self.llm.ainvoke(messages)
+        
+        result = self._package_research(topic, focus_areas, response.content)
+        if not any(r.startswith("Search error") for r in results):
+            self.cache.set(cache_key, result)
+        return dict(result)
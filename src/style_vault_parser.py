@@ -3,12 +3,45 @@ Style Vault Parser
 Parses the style_vault.md file to extract example Instagram posts.
 """
 
+import os
 import re
 import logging
-from typing import List, Dict, Any, Optional
+from collections import defaultdict
+from typing import List, Dict, Any, NamedTuple, Optional, Tuple
 from pathlib import Path
 
 
+# One token stream for the whole vault: post open/close tags, ### Slide N
+# headers and **Title:** / **Content:** / **Layout:** field headers. A field
+# prefix without the closing ** still ends the preceding field.
+_TOKEN_RE = re.compile(
+    r'(?P<post_open><post\s+(?P<attrs>[^>]+)>)'
+    r'|(?P<post_close></post>)'
+    r'|###\s+Slide\s+(?P<slide>\d+)'
+    r'|\*\*(?P<field>Title|Content|Layout):(?P<field_close>\*\*)?'
+)
+
+# attribute="value" or attribute='value'
+_ATTR_RE = re.compile(r'(\w+)=["\'](.*?)["\']')
+
+# Three or more consecutive newlines
+_BLANK_LINES_RE = re.compile(r'\n{3,}')
+
+# Layout of a post rendered by format_post_as_example
+_EXAMPLE_HEADER_TMPL = "Example Post: {topic}\nStyle: {style}\nNumber of Slides: {slide_count}\n\n---\n"
+_EXAMPLE_SLIDE_TMPL = "\nSlide {page_number}:\n  Title: {title}\n  Content: {content}...\n  Layout: {layout}\n"
+
+
+class _VaultIndex(NamedTuple):
+    """Parsed posts plus lookup indices, built once per file version."""
+    mtime_ns: int
+    posts: List[Dict[str, Any]]
+    by_id: Dict[str, Dict[str, Any]]
+    by_style: Dict[str, List[Dict[str, Any]]]
+    topics_lower: List[Tuple[str, Dict[str, Any]]]
+    examples: Dict[int, str]  # formatted prompt examples by limit
+
+
 class StyleVaultParser:
     """Parser for extracting Instagram post examples from style_vault.md"""
     
@@ -22,31 +55,62 @@ class StyleVaultParser:
         self.vault_file = vault_file
         self.logger = logging.getLogger(__name__)
         
+        # Posts and indices of the last parse; reused until the file changes
+        self._cache: Optional[_VaultIndex] = None
+        
     def load_style_vault(self) -> List[Dict[str, Any]]:
         """
         Load and parse all posts from the style vault.
         
+        Parsed posts are cached and only re-parsed when the file's modification
+        time changes. The returned list is a copy, but the post dictionaries are
+        shared with the cache and should be treated as read-only.
+        
         Returns:
             List of dictionaries containing parsed post data
         """
+        index = self._load_index()
+        return list(index.posts) if index else []
+    
+    def _load_index(self) -> Optional[_VaultIndex]:
+        """
+        Return the cached posts and indices, re-parsing if the file changed.
+        
+        Returns:
+            The vault index, or None if the file could not be loaded
+        """
         try:
+            mtime_ns = os.stat(self.vault_file).st_mtime_ns
+            if self._cache is not None and self._cache.mtime_ns == mtime_ns:
+                return self._cache
+            
             with open(self.vault_file, 'r', encoding='utf-8') as f:
                 content = f.read()
             
             posts = self._parse_posts(content)
+            
+            by_id = {}
+            by_style = defaultdict(list)
+            for post in posts:
+                # The first post with a given id wins, as with a linear scan
+                by_id.setdefault(post["id"], post)
+                by_style[post["style"]].append(post)
+            topics_lower = [(post["topic"].lower(), post) for post in posts]
+            
+            self._cache = _VaultIndex(mtime_ns, posts, by_id, dict(by_style), topics_lower, {})
             self.logger.info(f"Loaded {len(posts)} example posts from style vault")
-            return posts
+            return self._cache
             
         except FileNotFoundError:
             self.logger.warning(f"Style vault file not found: {self.vault_file}")
-            return []
+            return None
         except Exception as e:
             self.logger.error(f"Error loading style vault: {str(e)}")
-            return []
+            return None
     
     def _parse_posts(self, content: str) -> List[Dict[str, Any]]:
         """
-        Parse posts from markdown content.
+        Parse posts from markdown content in a single pass over its tokens.
         
         Args:
             content: Markdown content containing posts
@@ -55,20 +119,54 @@ class StyleVaultParser:
             List of parsed post dictionaries
         """
         posts = []
-        
-        # Find all <post> tags and their content
-        post_pattern = r'<post\s+([^>]+)>(.*?)</post>'
-        matches = re.finditer(post_pattern, content, re.DOTALL)
-        
-        for match in matches:
-            attributes_str = match.group(1)
-            post_content = match.group(2)
+        attributes = None   # attributes of the open post, None between posts
+        slides = []
+        fields = None       # fields of the open slide, None before the first slide
+        slide_num = 0
+        field_name = None   # field whose value is being read
+        field_start = 0
+        
+        for match in _TOKEN_RE.finditer(content):
+            if attributes is None:
+                # Outside a post only an opening tag matters
+                if match['post_open'] is not None:
+                    attributes = self._parse_attributes(match['attrs'])
+                    slides = []
+                    fields = None
+                continue
+            
+            if match['post_open'] is not None:
+                # Nested opening tags are plain text until </post>
+                continue
             
-            # Parse attributes
-            attributes = self._parse_attributes(attributes_str)
+            # Every other token ends the field being read; the first
+            # occurrence of a field wins
+            if field_name is not None:
+                if field_name not in fields:
+                    value = content[field_start:match.start()].strip()
+                    # Clean up extra whitespace and newlines
+                    fields[field_name] = _BLANK_LINES_RE.sub('\n\n', value)
+                field_name = None
             
-            # Parse slides
-            slides = self._parse_slides(post_content)
+            if match['field'] is not None:
+                if fields is not None and match['field_close'] is not None:
+                    field_name = match['field']
+                    field_start = match.end()
+                continue
+            
+            # A slide header or </post> closes the open slide
+            if fields is not None:
+                slides.append({
+                    "page_number": slide_num,
+                    "title": fields.get("Title", ""),
+                    "content": fields.get("Content", ""),
+                    "layout": fields.get("Layout", "")
+                })
+            
+            if match['slide'] is not None:
+                slide_num = int(match['slide'])
+                fields = {}
+                continue
             
             # Parse slide count from attributes
             try:
@@ -76,15 +174,15 @@ class StyleVaultParser:
             except (ValueError, TypeError):
                 slide_count = len(slides)
             
-            post_data = {
+            posts.append({
                 "id": attributes.get("id", "unknown"),
                 "topic": attributes.get("topic", "Unknown"),
                 "style": attributes.get("style", "educational"),
                 "slide_count": slide_count,
                 "slides": slides
-            }
-            
-            posts.append(post_data)
+            })
+            attributes = None
+            fields = None
         
         return posts
     
@@ -101,8 +199,7 @@ class StyleVaultParser:
         attributes = {}
         
         # Match attribute="value" or attribute='value'
-        attr_pattern = r'(\w+)=["\'](.*?)["\']'
-        matches = re.finditer(attr_pattern, attributes_str)
+        matches = _ATTR_RE.finditer(attributes_str)
         
         for match in matches:
             key = match.group(1)
@@ -111,62 +208,6 @@ class StyleVaultParser:
         
         return attributes
     
-    def _parse_slides(self, content: str) -> List[Dict[str, str]]:
-        """
-        Parse individual slides from post content.
-        
-        Args:
-            content: Post content containing slide definitions
-            
-        Returns:
-            List of slide dictionaries
-        """
-        slides = []
-        
-        # Split by slide headers (### Slide N)
-        slide_pattern = r'###\s+Slide\s+(\d+)(.*?)(?=###\s+Slide\s+\d+|$)'
-        matches = re.finditer(slide_pattern, content, re.DOTALL)
-        
-        for match in matches:
-            slide_num = int(match.group(1))
-            slide_content = match.group(2).strip()
-            
-            # Extract title, content, and layout
-            title = self._extract_field(slide_content, "Title")
-            slide_text = self._extract_field(slide_content, "Content")
-            layout = self._extract_field(slide_content, "Layout")
-            
-            slides.append({
-                "page_number": slide_num,
-                "title": title,
-                "content": slide_text,
-                "layout": layout
-            })
-        
-        return slides
-    
-    def _extract_field(self, content: str, field_name: str) -> str:
-        """
-        Extract a field value from slide content.
-        
-        Args:
-            content: Slide content
-            field_name: Name of field to extract (Title, Content, or Layout)
-            
-        Returns:
-            Extracted field value
-        """
-        pattern = rf'\*\*{field_name}:\*\*\s*(.*?)(?=\*\*(?:Title|Content|Layout):|$)'
-        match = re.search(pattern, content, re.DOTALL)
-        
-        if match:
-            value = match.group(1).strip()
-            # Clean up extra whitespace and newlines
-            value = re.sub(r'\n{3,}', '\n\n', value)
-            return value
-        
-        return ""
-    
     def get_post_by_id(self, post_id: str) -> Optional[Dict[str, Any]]:
         """
         Get a specific post by its ID.
@@ -177,11 +218,10 @@ class StyleVaultParser:
         Returns:
             Post dictionary or None if not found
         """
-        posts = self.load_style_vault()
-        
-        for post in posts:
-            if post["id"] == post_id:
-                return post
+        index = self._load_index()
+        post = index.by_id.get(post_id) if index else None
+        if post is not None:
+            return post
         
         self.logger.warning(f"Post with id '{post_id}' not found in style vault")
         return None
@@ -196,12 +236,14 @@ class StyleVaultParser:
         Returns:
             List of matching posts
         """
-        posts = self.load_style_vault()
+        index = self._load_index()
+        if not index:
+            return []
         topic_lower = topic.lower()
         
         matching_posts = [
-            post for post in posts 
-            if topic_lower in post["topic"].lower()
+            post for post_topic, post in index.topics_lower
+            if topic_lower in post_topic
         ]
         
         return matching_posts
@@ -216,14 +258,11 @@ class StyleVaultParser:
         Returns:
             List of matching posts
         """
-        posts = self.load_style_vault()
-        
-        matching_posts = [
-            post for post in posts 
-            if post["style"] == style
-        ]
+        index = self._load_index()
+        if not index:
+            return []
         
-        return matching_posts
+        return list(index.by_style.get(style, ()))
     
     def format_post_as_example(self, post: Dict[str, Any]) -> str:
         """
@@ -235,20 +274,18 @@ class StyleVaultParser:
         Returns:
             Formatted string representation
         """
-        output = []
-        output.append(f"Example Post: {post['topic']}")
-        output.append(f"Style: {post['style']}")
-        output.append(f"Number of Slides: {post['slide_count']}")
-        output.append("\n---\n")
-        
-        for slide in post['slides']:
-            output.append(f"Slide {slide['page_number']}:")
-            output.append(f"  Title: {slide['title']}")
-            output.append(f"  Content: {slide['content'][:100]}...")  # Truncate for brevity
-            output.append(f"  Layout: {slide['layout']}")
-            output.append("")
-        
-        return "\n".join(output)
+        header = _EXAMPLE_HEADER_TMPL.format(
+            topic=post['topic'], style=post['style'], slide_count=post['slide_count']
+        )
+        return header + "".join(
+            _EXAMPLE_SLIDE_TMPL.format(
+                page_number=slide['page_number'],
+                title=slide['title'],
+                content=slide['content'][:100],  # Truncate for brevity
+                layout=slide['layout']
+            )
+            for slide in post['slides']
+        )
     
     def get_style_examples_for_prompt(self, limit: int = 2) -> str:
         """
@@ -260,16 +297,23 @@ class StyleVaultParser:
         Returns:
             Formatted string with example posts
         """
-        posts = self.load_style_vault()
+        index = self._load_index()
         
-        if not posts:
+        if not index or not index.posts:
             return "No style examples available."
         
+        # Formatted examples live on the index, so a file change discards them
+        cached = index.examples.get(limit)
+        if cached is not None:
+            return cached
+        
         examples = []
         examples.append("=== STYLE REFERENCE EXAMPLES ===\n")
         
-        for post in posts[:limit]:
+        for post in index.posts[:limit]:
             examples.append(self.format_post_as_example(post))
             examples.append("\n" + "="*50 + "\n")
         
-        return "\n".join(examples)
+        formatted = "\n".join(examples)
+        index.examples[limit] = formatted
+        return formatted
@@ -3,9 +3,27 @@ Utility functions for the Instagram Agents workflow.
 """
 
 import logging
-import json
+import os
 from datetime import datetime
-from typing import Dict, Any
+from typing import TYPE_CHECKING, Dict, Any, Tuple
+import orjson
+
+# Type-only import: importing the workflow module pulls in LangGraph
+if TYPE_CHECKING:
+    from src.workflow import WorkflowState
+
+
+# Raw bytes of each loaded config file, keyed by path and validated by
+# (mtime_ns, size); re-parsing the bytes hands every caller its own dict
+_config_cache: Dict[str, Tuple[Tuple[int, int], bytes]] = {}
+
+# Console layout of a post rendered by format_post_for_display
+_DISPLAY_RULE = '─' * 80
+_DISPLAY_HEADER_TMPL = "\n" + "=" * 80 + "\nINSTAGRAM POST: {topic}\nTotal Slides: {slide_count}\n" + "=" * 80 + "\n"
+_DISPLAY_SLIDE_TMPL = (
+    "\n\n" + _DISPLAY_RULE + "\n📄 SLIDE {page_number}\n" + _DISPLAY_RULE +
+    "\n\n🏷️  TITLE: {title}\n\n📝 CONTENT:\n{content}\n\n🎨 LAYOUT: {layout}\n" + _DISPLAY_RULE
+)
 
 
 def setup_logging(log_file: str = "instagram_agents.log", log_level: int = logging.INFO):
@@ -22,8 +40,8 @@ def setup_logging(log_file: str = "instagram_agents.log", log_level: int = loggi
         datefmt='%Y-%m-%d %H:%M:%S'
     )
     
-    # File handler
-    file_handler = logging.FileHandler(log_file, mode='a')
+    # File handler; the file is opened on the first record rather than here
+    file_handler = logging.FileHandler(log_file, mode='a', delay=True)
     file_handler.setLevel(log_level)
     file_handler.setFormatter(formatter)
     
@@ -46,7 +64,7 @@ def setup_logging(log_file: str = "instagram_agents.log", log_level: int = loggi
     return root_logger
 
 
-def log_workflow_state(state: Dict[str, Any], phase: str, log_file: str):
+def log_workflow_state(state: "WorkflowState", phase: str, log_file: str):
     """
     Log the current workflow state to a file.
     
@@ -56,24 +74,27 @@ def log_workflow_state(state: Dict[str, Any], phase: str, log_file: str):
         log_file: Path to the log file
     """
     logger = logging.getLogger(__name__)
+    if not logger.isEnabledFor(logging.INFO):
+        return
     
     try:
         log_entry = {
-            "timestamp": datetime.now().isoformat(),
+            # orjson serializes datetimes in the same form as isoformat()
+            "timestamp": datetime.now(),
             "phase": phase,
-            "iteration": state.get("iteration", 0),
-            "topic": state.get("topic", "N/A")
+            "iteration": state.iteration,
+            "topic": state.topic or "N/A"
         }
         
         if phase == "research":
-            log_entry["research_word_count"] = state.get("research_data", {}).get("word_count", 0)
+            log_entry["research_word_count"] = state.research_data.get("word_count", 0)
         elif phase == "draft":
-            log_entry["slide_count"] = state.get("post_data", {}).get("slide_count", 0)
+            log_entry["slide_count"] = state.post_data.get("slide_count", 0)
         elif phase == "review":
-            log_entry["decision"] = state.get("review_decision", {}).get("decision", "N/A")
-            log_entry["feedback"] = state.get("review_decision", {}).get("feedback", "N/A")
+            log_entry["decision"] = state.review_decision.get("decision", "N/A")
+            log_entry["feedback"] = state.review_decision.get("feedback", "N/A")
         
-        logger.info(f"{phase.upper()}: {json.dumps(log_entry, indent=2)}")
+        logger.info("%s: %s", phase.upper(), orjson.dumps(log_entry).decode())
         
     except Exception as e:
         logger.error(f"Error logging workflow state: {str(e)}")
@@ -94,9 +115,12 @@ def save_final_post(post_data: Dict[str, Any], output_file: str = None):
         topic = post_data.get("topic", "unknown").replace(" ", "_").lower()
         output_file = f"instagram_post_{topic}_{timestamp}.json"
     
+    # Drop internal cached fields such as the rendered "_display" text
+    post_data = {k: v for k, v in post_data.items() if not k.startswith("_")}
+    
     try:
-        with open(output_file, 'w') as f:
-            json.dump(post_data, f, indent=2)
+        with open(output_file, 'wb') as f:
+            f.write(orjson.dumps(post_data, option=orjson.OPT_INDENT_2))
         
         logger.info(f"Final post saved to: {output_file}")
         return output_file
@@ -119,22 +143,18 @@ def format_post_for_display(post_data: Dict[str, Any]) -> str:
     if not post_data or "post" not in post_data:
         return "No post data available"
     
-    lines = []
-    lines.append("\n" + "="*80)
-    lines.append(f"INSTAGRAM POST: {post_data.get('topic', 'Unknown')}")
-    lines.append(f"Total Slides: {post_data.get('slide_count', 0)}")
-    lines.append("="*80 + "\n")
-    
-    for slide in post_data["post"].get("slides", []):
-        lines.append(f"\n{'─'*80}")
-        lines.append(f"📄 SLIDE {slide.get('page_number', '?')}")
-        lines.append(f"{'─'*80}")
-        lines.append(f"\n🏷️  TITLE: {slide.get('title', 'N/A')}\n")
-        lines.append(f"📝 CONTENT:\n{slide.get('content', 'N/A')}\n")
-        lines.append(f"🎨 LAYOUT: {slide.get('layout', 'N/A')}")
-        lines.append(f"{'─'*80}")
-    
-    return "\n".join(lines)
+    header = _DISPLAY_HEADER_TMPL.format(
+        topic=post_data.get('topic', 'Unknown'), slide_count=post_data.get('slide_count', 0)
+    )
+    return header + "".join(
+        _DISPLAY_SLIDE_TMPL.format(
+            page_number=slide.get('page_number', '?'),
+            title=slide.get('title', 'N/A'),
+            content=slide.get('content', 'N/A'),
+            layout=slide.get('layout', 'N/A')
+        )
+        for slide in post_data["post"].get("slides", [])
+    )
 
 
 def load_config(config_file: str = "config.json") -> Dict[str, Any]:
@@ -148,10 +168,15 @@ def load_config(config_file: str = "config.json") -> Dict[str, Any]:
         Configuration dictionary
     """
     try:
-        with open(config_file, 'r') as f:
-            config = json.load(f)
-        return config
+        st = os.stat(config_file)
+        key = (st.st_mtime_ns, st.st_size)
+        cached = _config_cache.get(config_file)
+        if cached is None or cached[0] != key:
+            with open(config_file, 'rb') as f:
+                cached = (key, f.read())
+            _config_cache[config_file] = cached
+        return orjson.loads(cached[1])
     except FileNotFoundError:
         raise FileNotFoundError(f"Configuration file not found: {config_file}")
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         raise ValueError(f"Invalid JSON in configuration file: {str(e)}")
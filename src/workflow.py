@@ -3,29 +3,44 @@ LangGraph Workflow for Instagram Post Creation
 Orchestrates the Researcher, Drafter, and Editor agents.
 """
 
+import hashlib
 import logging
-from typing import Dict, Any, TypedDict, Annotated
+import pickle
+from dataclasses import dataclass, field
+from typing import Dict, Any, Tuple, Annotated
 from langgraph.graph import StateGraph, END
 from langgraph.graph.message import add_messages
-from langchain_core.messages import SystemMessage
+from langchain_core.runnables import RunnableLambda
 
 
-class WorkflowState(TypedDict):
+# Most recent audit messages kept in the workflow state
+MAX_MESSAGES = 32
+
+
+def add_recent_messages(left: list, right: list) -> list:
+    """add_messages reducer that keeps only the last MAX_MESSAGES entries."""
+    return add_messages(left, right)[-MAX_MESSAGES:]
+
+
+@dataclass(slots=True)
+class WorkflowState:
     """State for the Instagram post creation workflow."""
-    topic: str
-    research_data: Dict[str, Any]
-    post_data: Dict[str, Any]
-    review_decision: Dict[str, Any]
-    iteration: int
-    max_iterations: int
-    messages: Annotated[list, add_messages]
-    final_post: Dict[str, Any]
+    topic: str = ""
+    research_data: Dict[str, Any] = field(default_factory=dict)
+    post_data: Dict[str, Any] = field(default_factory=dict)
+    review_decision: Dict[str, Any] = field(default_factory=dict)
+    iteration: int = 0
+    max_iterations: int = 10
+    # Nodes return only their new message; the reducer appends it
+    messages: Annotated[list, add_recent_messages] = field(default_factory=list)
+    final_post: Dict[str, Any] = field(default_factory=dict)
 
 
 class InstagramWorkflow:
     """LangGraph workflow for creating Instagram posts."""
     
-    def __init__(self, researcher_agent, drafter_agent, editor_agent, max_iterations: int = 10):
+    def __init__(self, researcher_agent, drafter_agent, editor_agent, max_iterations: int = 10,
+                 fuse_first_review: bool = False):
         """
         Initialize the workflow.
         
@@ -34,13 +49,18 @@ class InstagramWorkflow:
             drafter_agent: Instance of DrafterAgent
             editor_agent: Instance of EditorInChiefAgent
             max_iterations: Maximum number of iteration cycles
+            fuse_first_review: Draft and review the first pass in a single LLM call
         """
         self.researcher = researcher_agent
         self.drafter = drafter_agent
         self.editor = editor_agent
         self.max_iterations = max_iterations
+        self.fuse_first_review = fuse_first_review
         self.logger = logging.getLogger(__name__)
         
+        # Revision results keyed by a fingerprint of their inputs
+        self._revise_cache: Dict[str, Tuple[Dict[str, Any], Dict[str, Any]]] = {}
+        
         # Build the workflow graph
         self.workflow = self._build_graph()
     
@@ -51,26 +71,32 @@ class InstagramWorkflow:
         
         # Add nodes
         workflow.add_node("research", self.research_node)
-        workflow.add_node("draft", self.draft_node)
+        if self.fuse_first_review:
+            workflow.add_node("draft_and_review", self.draft_and_review_node)
+        else:
+            workflow.add_node("draft", RunnableLambda(self.draft_node, afunc=self.adraft_node))
         workflow.add_node("review", self.review_node)
-        workflow.add_node("revise", self.revise_node)
+        # Sync invoke uses revise_node, ainvoke the concurrent arevise_node
+        # (likewise for the draft node)
+        workflow.add_node("revise", RunnableLambda(self.revise_node, afunc=self.arevise_node))
         workflow.add_node("finalize", self.finalize_node)
         
         # Set entry point
         workflow.set_entry_point("research")
         
         # Add edges
-        workflow.add_edge("research", "draft")
-        workflow.add_edge("draft", "review")
-        workflow.add_conditional_edges(
-            "review",
-            self.review_decision_router,
-            {
-                "approved": "finalize",
-                "revise": "revise",
-                "max_iterations": "finalize"
-            }
-        )
+        routes = {
+            "approved": "finalize",
+            "revise": "revise",
+            "max_iterations": "finalize"
+        }
+        if self.fuse_first_review:
+            workflow.add_edge("research", "draft_and_review")
+            workflow.add_conditional_edges("draft_and_review", self.review_decision_router, routes)
+        else:
+            workflow.add_edge("research", "draft")
+            workflow.add_edge("draft", "review")
+        workflow.add_conditional_edges("review", self.review_decision_router, routes)
         workflow.add_edge("revise", "review")
         workflow.add_edge("finalize", END)
         
@@ -78,89 +104,146 @@ class InstagramWorkflow:
     
     def research_node(self, state: WorkflowState) -> WorkflowState:
         """Node for conducting research."""
-        self.logger.info(f"=== RESEARCH NODE (Iteration {state.get('iteration', 0)}) ===")
+        self.logger.info(f"=== RESEARCH NODE (Iteration {state.iteration}) ===")
         
-        topic = state["topic"]
+        topic = state.topic
         research_data = self.researcher.research(topic)
         
-        state["research_data"] = research_data
-        state["messages"].append(
-            SystemMessage(content=f"Research completed for topic: {topic}")
-        )
+        state.research_data = research_data
+        state.messages = [("system", f"Research completed for topic: {topic}")]
         
         return state
     
     def draft_node(self, state: WorkflowState) -> WorkflowState:
         """Node for drafting the Instagram post."""
-        self.logger.info(f"=== DRAFT NODE (Iteration {state.get('iteration', 0)}) ===")
+        self.logger.info(f"=== DRAFT NODE (Iteration {state.iteration}) ===")
         
-        research_data = state["research_data"]
+        research_data = state.research_data
         post_data = self.drafter.draft_post(research_data)
         
-        state["post_data"] = post_data
-        state["messages"].append(
-            SystemMessage(content=f"Draft completed with {post_data.get('slide_count', 0)} slides")
-        )
+        state.post_data = post_data
+        state.messages = [("system", f"Draft completed with {post_data.get('slide_count', 0)} slides")]
+        
+        return state
+    
+    async def adraft_node(self, state: WorkflowState) -> WorkflowState:
+        """Async node for drafting the Instagram post."""
+        self.logger.info(f"=== DRAFT NODE (Iteration {state.iteration}) ===")
+        
+        post_data = await self.drafter.adraft_post(state.research_data)
+        
+        state.post_data = post_data
+        state.messages = [("system", f"Draft completed with {post_data.get('slide_count', 0)} slides")]
         
         return state
     
     def review_node(self, state: WorkflowState) -> WorkflowState:
         """Node for reviewing the post."""
-        iteration = state.get("iteration", 0)
+        iteration = state.iteration
         self.logger.info(f"=== REVIEW NODE (Iteration {iteration}) ===")
         
-        post_data = state["post_data"]
-        research_data = state["research_data"]
+        post_data = state.post_data
+        research_data = state.research_data
         
         review_decision = self.editor.review_post(post_data, research_data)
         
-        state["review_decision"] = review_decision
-        state["iteration"] = iteration + 1
-        state["messages"].append(
-            SystemMessage(content=f"Review completed. Decision: {review_decision.get('decision')}")
-        )
+        state.review_decision = review_decision
+        state.iteration = iteration + 1
+        state.messages = [("system", f"Review completed. Decision: {review_decision.get('decision')}")]
+        
+        return state
+    
+    def draft_and_review_node(self, state: WorkflowState) -> WorkflowState:
+        """Node for drafting and reviewing the first pass in one LLM call."""
+        iteration = state.iteration
+        self.logger.info(f"=== DRAFT AND REVIEW NODE (Iteration {iteration}) ===")
+        
+        post_data, review_decision = self.editor.draft_and_review(state.research_data)
+        
+        state.post_data = post_data
+        state.review_decision = review_decision
+        state.iteration = iteration + 1
+        state.messages = [("system", f"Draft and review completed. Decision: {review_decision.get('decision')}")]
         
         return state
     
     def revise_node(self, state: WorkflowState) -> WorkflowState:
         """Node for revising based on editor feedback."""
-        self.logger.info(f"=== REVISE NODE (Iteration {state.get('iteration', 0)}) ===")
+        self.logger.info(f"=== REVISE NODE (Iteration {state.iteration}) ===")
         
-        review_decision = state["review_decision"]
-        research_data = state["research_data"]
-        post_data = state["post_data"]
-        topic = state["topic"]
+        review_decision = state.review_decision
+        research_data = state.research_data
+        post_data = state.post_data
+        topic = state.topic
         
-        # Execute the revision action
-        updated_research, updated_post = self.editor.execute_action(
-            review_decision, research_data, post_data, topic
-        )
+        fingerprint = self._revise_fingerprint(state)
+        cached = self._revise_cache.get(fingerprint)
+        if cached is not None:
+            self.logger.info("Reusing revision for an identical review")
+            updated_research, updated_post = cached
+        else:
+            # Execute the revision action
+            updated_research, updated_post = self.editor.execute_action(
+                review_decision, research_data, post_data, topic
+            )
+            self._revise_cache[fingerprint] = (updated_research, updated_post)
         
-        state["research_data"] = updated_research
-        state["post_data"] = updated_post
-        state["messages"].append(
-            SystemMessage(content=f"Revision completed based on: {review_decision.get('decision')}")
-        )
+        state.research_data = updated_research
+        state.post_data = updated_post
+        state.messages = [("system", f"Revision completed based on: {review_decision.get('decision')}")]
         
         return state
     
-    def finalize_node(self, state: WorkflowState) -> WorkflowState:
-        """Node for finalizing the post."""
-        self.logger.info("=== FINALIZE NODE ===")
+    async def arevise_node(self, state: WorkflowState) -> WorkflowState:
+        """Async node for revising based on editor feedback."""
+        self.logger.info(f"=== REVISE NODE (Iteration {state.iteration}) ===")
         
-        state["final_post"] = state["post_data"]
-        state["messages"].append(
-            SystemMessage(content="Post finalized and ready for publication")
-        )
+        review_decision = state.review_decision
+        
+        fingerprint = self._revise_fingerprint(state)
+        cached = self._revise_cache.get(fingerprint)
+        if cached is not None:
+            self.logger.info("Reusing revision for an identical review")
+            updated_research, updated_post = cached
+        else:
+            updated_research, updated_post = await self.editor.aexecute_action(
+                review_decision, state.research_data, state.post_data, state.topic
+            )
+            self._revise_cache[fingerprint] = (updated_research, updated_post)
+        
+        state.research_data = updated_research
+        state.post_data = updated_post
+        state.messages = [("system", f"Revision completed based on: {review_decision.get('decision')}")]
         
         return state
     
+    @staticmethod
+    def _revise_fingerprint(state: WorkflowState) -> str:
+        """Hash the inputs that determine a revision's outcome."""
+        review_decision = state.review_decision
+        payload = pickle.dumps((
+            review_decision.get("decision"),
+            review_decision.get("feedback"),
+            review_decision.get("suggestions"),
+            state.research_data,
+            state.post_data,
+        ))
+        return hashlib.blake2b(payload, digest_size=16).hexdigest()
+    
+    def finalize_node(self, state: WorkflowState) -> Dict[str, Any]:
+        """Node for finalizing the post."""
+        self.logger.info("=== FINALIZE NODE ===")
+        
+        # Only final_post changes, so return just that update; the post is
+        # passed by reference rather than copied
+        return {"final_post": state.post_data}
+    
     def review_decision_router(self, state: WorkflowState) -> str:
         """Route based on review decision."""
-        review_decision = state.get("review_decision", {})
+        review_decision = state.review_decision
         decision = review_decision.get("decision", "revise_draft")
-        iteration = state.get("iteration", 0)
-        max_iterations = state.get("max_iterations", self.max_iterations)
+        iteration = state.iteration
+        max_iterations = state.max_iterations
         
         # Check if max iterations reached
         if iteration >= max_iterations:
@@ -173,6 +256,29 @@ class InstagramWorkflow:
         else:
             return "revise"
     
+    def _initial_state(self, topic: str) -> WorkflowState:
+        """Build the starting state for a workflow run."""
+        self._revise_cache.clear()
+        
+        self.logger.info(f"\n{'='*80}")
+        self.logger.info(f"Starting Instagram Post Creation Workflow for: {topic}")
+        self.logger.info(f"{'='*80}\n")
+        
+        return WorkflowState(topic=topic, max_iterations=self.max_iterations)
+    
+    def _summarize(self, final_state: Dict[str, Any]) -> Dict[str, Any]:
+        """Collect the final post and workflow metadata from the end state."""
+        self.logger.info(f"\n{'='*80}")
+        self.logger.info(f"Workflow completed after {final_state['iteration']} iterations")
+        self.logger.info(f"{'='*80}\n")
+        
+        return {
+            "final_post": final_state["final_post"],
+            "iterations": final_state["iteration"],
+            "research_data": final_state["research_data"],
+            "messages": final_state["messages"]
+        }
+    
     def run(self, topic: str) -> Dict[str, Any]:
         """
         Run the workflow for a given topic.
@@ -183,32 +289,20 @@ class InstagramWorkflow:
         Returns:
             Dictionary containing the final post and workflow metadata
         """
-        self.logger.info(f"\n{'='*80}")
-        self.logger.info(f"Starting Instagram Post Creation Workflow for: {topic}")
-        self.logger.info(f"{'='*80}\n")
-        
-        # Initialize state
-        initial_state = {
-            "topic": topic,
-            "research_data": {},
-            "post_data": {},
-            "review_decision": {},
-            "iteration": 0,
-            "max_iterations": self.max_iterations,
-            "messages": [],
-            "final_post": {}
-        }
+        final_state = self.workflow.invoke(self._initial_state(topic))
+        return self._summarize(final_state)
+    
+    async def arun(self, topic: str) -> Dict[str, Any]:
+        """
+        Run the workflow asynchronously for a given topic.
         
-        # Run the workflow
-        final_state = self.workflow.invoke(initial_state)
+        Research revisions search each editor suggestion concurrently.
         
-        self.logger.info(f"\n{'='*80}")
-        self.logger.info(f"Workflow completed after {final_state.get('iteration', 0)} iterations")
-        self.logger.info(f"{'='*80}\n")
-        
-        return {
-            "final_post": final_state.get("final_post", {}),
-            "iterations": final_state.get("iteration", 0),
-            "research_data": final_state.get("research_data", {}),
-            "messages": final_state.get("messages", [])
-        }
+        Args:
+            topic: The topic to create an Instagram post about
+            
+        Returns:
+            Dictionary containing the final post and workflow metadata
+        """
+        final_state = await self.workflow.ainvoke(self._initial_state(topic))
+        return self._summarize(final_state)
@@ -0,0 +1,273 @@
+"""
+Tests for the individual agents, run against fake search clients and language models.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import orjson
+import pytest
+
+
+class FakeLLM:
+    """Chat model stub that counts calls and answers with fixed content."""
+
+    def __init__(self, content="Synthesized research"):
+        self.content = content
+        self.calls = 0
+
+    def invoke(self, messages):
+        self.calls += 1
+        return SimpleNamespace(content=self.content)
+
+    async def ainvoke(self, messages):
+        return self.invoke(messages)
+
+
+class FakeTavilyClient:
+    """Sync Tavily stub recording queries; raises for queries containing "fail"."""
+
+    def __init__(self):
+        self.queries = []
+
+    def search(self, query, search_depth, max_results):
+        self.queries.append((query, max_results))
+        if "fail" in query:
+            raise RuntimeError("quota exceeded")
+        return {"results": [{"title": query, "content": "Body", "url": "https://example.com"}]}
+
+
+class FakeAsyncTavilyClient(FakeTavilyClient):
+    """Async Tavily stub; every instance shares the class-level query log."""
+
+    queries = []
+
+    def __init__(self, api_key):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return None
+
+    async def search(self, query, search_depth, max_results):
+        return FakeTavilyClient.search(self, query, search_depth, max_results)
+
+
+@pytest.fixture
+def researcher(monkeypatch):
+    """ResearcherAgent wired to fake Tavily clients and a fake LLM."""
+    import tavily
+    from src.researcher_agent import ResearcherAgent
+
+    FakeAsyncTavilyClient.queries = []
+    monkeypatch.setattr(tavily, "AsyncTavilyClient", FakeAsyncTavilyClient)
+
+    agent = ResearcherAgent({"word_limit": 100}, FakeLLM(), "test-key")
+    agent.tavily_client = FakeTavilyClient()
+    return agent
+
+
+def test_aresearch_fans_out_focus_areas(researcher):
+    """Test that each focus area is searched with its share of the result budget."""
+    result = asyncio.run(researcher.aresearch("Random Forests", "bagging, feature importance, depth"))
+
+    assert sorted(FakeAsyncTavilyClient.queries) == [
+        ("Random Forests bagging", 3),
+        ("Random Forests depth", 3),
+        ("Random Forests feature importance", 3),
+    ]
+    assert result["research_content"] == "Synthesized research"
+
+    asyncio.run(researcher.aresearch("Random Forests", "bagging, feature importance, depth"))
+    assert len(FakeAsyncTavilyClient.queries) == 3, "Repeated research should hit the cache"
+    assert researcher.llm.calls == 1
+
+
+@pytest.mark.parametrize("focus_areas, expected_budget", [(None, 10), ("one, two", 5)])
+def test_aresearch_result_budget(researcher, focus_areas, expected_budget):
+    """Test that the ten-result budget is split across focus areas."""
+    asyncio.run(researcher.aresearch("Random Forests", focus_areas))
+
+    assert {budget for _, budget in FakeAsyncTavilyClient.queries} == {expected_budget}
+
+
+def test_aresearch_does_not_cache_search_errors(researcher):
+    """Test that research built on a failed search is not cached."""
+    asyncio.run(researcher.aresearch("Random Forests", "bagging, fail"))
+    asyncio.run(researcher.aresearch("Random Forests", "bagging, fail"))
+
+    assert len(FakeAsyncTavilyClient.queries) == 4
+    assert researcher.llm.calls == 2
+
+
+def test_research_cache_hit_skips_search_and_llm(researcher):
+    """Test that repeated research is served from the cache as an independent copy."""
+    first = researcher.research("Random Forests", "bagging")
+    first["research_content"] = "mutated by the caller"
+    second = researcher.research("Random Forests", "bagging")
+
+    assert researcher.tavily_client.queries == [("Random Forests bagging", 10)]
+    assert researcher.llm.calls == 1
+    assert second["research_content"] == "Synthesized research"
+
+    researcher.research("Random Forests", "depth")
+    assert researcher.llm.calls == 2, "Different focus areas should miss the cache"
+
+
+def test_research_does_not_cache_search_errors(researcher):
+    """Test that research built on a failed search is retried rather than cached."""
+    researcher.research("Random Forests", "fail")
+    researcher.research("Random Forests", "fail")
+
+    assert len(researcher.tavily_client.queries) == 2
+    assert researcher.llm.calls == 2
+
+
+def test_stream_slides_stops_at_max_slides():
+    """Test that streamed slides arrive in order and stop at max_slides."""
+    from langchain_core.language_models.fake_chat_models import FakeListChatModel
+    from src.drafter_agent import DrafterAgent
+
+    slides = [
+        {"page_number": idx, "title": f"Slide {idx}", "content": "Body", "layout": "Centered"}
+        for idx in range(1, 5)
+    ]
+    response = "```json\n" + orjson.dumps({"slides": slides}).decode() + "\n```"
+    drafter = DrafterAgent(
+        {"max_slides": 3, "use_style_vault": False}, FakeListChatModel(responses=[response])
+    )
+
+    streamed = list(drafter.stream_slides({"topic": "Random Forests", "research_content": "Notes"}))
+
+    assert streamed == slides[:3]
+
+
+def test_stream_slides_flushes_last_slide():
+    """Test that the final slide is yielded once the stream ends."""
+    from langchain_core.language_models.fake_chat_models import FakeListChatModel
+    from src.drafter_agent import DrafterAgent
+
+    slides = [
+        {"page_number": idx, "title": f"Slide {idx}", "content": "Body", "layout": "Centered"}
+        for idx in range(1, 3)
+    ]
+    drafter = DrafterAgent(
+        {"max_slides": 3, "use_style_vault": False},
+        FakeListChatModel(responses=[orjson.dumps({"slides": slides}).decode()])
+    )
+
+    streamed = list(drafter.stream_slides({"topic": "Random Forests", "research_content": "Notes"}))
+
+    assert streamed == slides
+
+
+class ScriptedResearcher:
+    """Researcher whose revisions return fixed content, or raise when given an exception."""
+
+    def __init__(self, outcome):
+        self.outcome = outcome
+
+    def research(self, topic, focus_areas=None):
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        return {"topic": topic, "research_content": self.outcome}
+
+    async def aresearch(self, topic, focus_areas=None):
+        # Yield once so a concurrently scheduled speculative draft starts
+        await asyncio.sleep(0)
+        return self.research(topic, focus_areas)
+
+
+class RecordingDrafter:
+    """Drafter that records which research and feedback each draft came from."""
+
+    post_schema = {}
+
+    def __init__(self, block_speculative=False):
+        self.block_speculative = block_speculative
+        self.drafts = []
+        self.cancelled = False
+
+    def draft_post(self, research_data, revision_feedback=None):
+        self.drafts.append((research_data["research_content"], bool(revision_feedback)))
+        return {"from": research_data["research_content"], "revised": bool(revision_feedback)}
+
+    async def adraft_post(self, research_data, revision_feedback=None):
+        if revision_feedback and self.block_speculative:
+            try:
+                await asyncio.sleep(3600)
+            except asyncio.CancelledError:
+                self.cancelled = True
+                raise
+        return self.draft_post(research_data, revision_feedback)
+
+
+class NoStructuredLLM:
+    """Chat model stub without structured output support."""
+
+    def with_structured_output(self, schema, include_raw=False):
+        raise NotImplementedError
+
+
+RESEARCH_REVISION = {"decision": "revise_research", "feedback": "Go deeper", "suggestions": ["Add an example"]}
+
+
+def _revise_research(outcome, use_async, speculative_draft=True, drafter=None):
+    """Run one research revision through the editor and return (research, post, drafter)."""
+    from src.editor_agent import EditorInChiefAgent
+
+    drafter = drafter or RecordingDrafter()
+    editor = EditorInChiefAgent(
+        {"speculative_draft": speculative_draft}, NoStructuredLLM(), ScriptedResearcher(outcome), drafter
+    )
+    args = (RESEARCH_REVISION, {"topic": "Random Forests", "research_content": "old"}, {}, "Random Forests")
+    try:
+        if use_async:
+            research, post = asyncio.run(editor.aexecute_action(*args))
+        else:
+            research, post = editor.execute_action(*args)
+    finally:
+        editor.close()
+    return research, post, drafter
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_speculative_draft_used_when_research_unchanged(use_async):
+    """Test that unchanged research returns the speculative revision of the current post."""
+    research, post, _ = _revise_research("old", use_async)
+
+    assert research["research_content"] == "old"
+    assert post == {"from": "old", "revised": True}
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_speculative_draft_used_when_research_fails(use_async):
+    """Test that a failed research call falls back to the speculative revision."""
+    research, post, _ = _revise_research(RuntimeError("search down"), use_async)
+
+    assert research["research_content"] == "old"
+    assert post == {"from": "old", "revised": True}
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_new_research_supersedes_speculative_draft(use_async):
+    """Test that new research is re-drafted and the speculative draft discarded."""
+    drafter = RecordingDrafter(block_speculative=True)
+    research, post, _ = _revise_research("new", use_async, drafter=drafter)
+
+    assert research["research_content"] == "new"
+    assert post == {"from": "new", "revised": False}
+    if use_async:
+        assert drafter.cancelled, "The pending speculative task should be cancelled"
+        assert drafter.drafts == [("new", False)]
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_research_revision_without_speculation(use_async):
+    """Test that with speculation off a research revision drafts exactly once."""
+    research, post, drafter = _revise_research("new", use_async, speculative_draft=False)
+
+    assert post == {"from": "new", "revised": False}
+    assert drafter.drafts == [("new", False)]
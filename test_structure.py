@@ -2,20 +2,14 @@
 Basic tests to validate the workflow structure and configuration.
 """
 
-import os
-import sys
-import json
+import pytest
 
-# Add the project root to the path
-sys.path.insert(0, os.path.dirname(__file__))
 
-
-def test_config_loading():
+def test_config_loading(config_file, config):
     """Test that configuration can be loaded."""
-    print("Testing config loading...")
     from src.utils import load_config
     
-    config = load_config('config.json')
+    assert load_config(config_file) == config, "load_config should return the parsed file"
     
     assert 'researcher' in config, "Config missing researcher section"
     assert 'drafter' in config, "Config missing drafter section"
@@ -35,14 +29,31 @@ def test_config_loading():
     # Check editor config
     assert 'model' in config['editor_in_chief']
     assert 'instructions' in config['editor_in_chief']
+
+
+def test_config_cache(tmp_path):
+    """Test that load_config picks up rewrites and returns independent dicts."""
+    import os
+    from src.utils import load_config
+    
+    config_file = tmp_path / "config.json"
+    config_file.write_text('{"general": {"max_total_iterations": 10}}')
+    
+    first = load_config(str(config_file))
+    first["general"]["max_total_iterations"] = 99
+    assert load_config(str(config_file))["general"]["max_total_iterations"] == 10, \
+        "Mutating a loaded config should not affect the cache"
     
-    print("✅ Config loading test passed")
+    config_file.write_text('{"general": {"max_total_iterations": 3}}')
+    # Bump the mtime in case the rewrite lands within the filesystem's resolution
+    st = os.stat(config_file)
+    os.utime(config_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert load_config(str(config_file)) == {"general": {"max_total_iterations": 3}}
 
 
+@pytest.mark.slow
 def test_module_imports():
     """Test that all modules can be imported."""
-    print("Testing module imports...")
-    
     from src.researcher_agent import ResearcherAgent
     from src.drafter_agent import DrafterAgent
     from src.editor_agent import EditorInChiefAgent
@@ -51,13 +62,10 @@ def test_module_imports():
         setup_logging, load_config, save_final_post, 
         format_post_for_display, log_workflow_state
     )
-    
-    print("✅ Module imports test passed")
 
 
 def test_post_formatting():
     """Test post formatting utility."""
-    print("Testing post formatting...")
     from src.utils import format_post_for_display
     
     test_post = {
@@ -79,101 +87,98 @@ def test_post_formatting():
     assert "Test Topic" in formatted
     assert "Test Slide" in formatted
     assert "Test content" in formatted
-    
-    print("✅ Post formatting test passed")
 
 
-def test_logging_setup():
+def test_logging_setup(tmp_path):
     """Test logging configuration."""
-    print("Testing logging setup...")
-    from src.utils import setup_logging
     import logging
+    from src.utils import setup_logging
     
-    logger = setup_logging('/tmp/test_instagram_agents.log')
-    assert logger is not None
-    logger.info("Test log message")
-    
-    # Verify log file was created
-    assert os.path.exists('/tmp/test_instagram_agents.log')
-    
-    print("✅ Logging setup test passed")
-
-
-def test_config_structure():
-    """Test that config has all required fields."""
-    print("Testing config structure...")
-    
-    with open('config.json', 'r') as f:
-        config = json.load(f)
-    
-    # Test researcher config structure
-    researcher = config['researcher']
-    assert isinstance(researcher.get('word_limit'), int)
-    assert isinstance(researcher.get('temperature'), (int, float))
-    assert isinstance(researcher.get('max_output_tokens'), int)
-    assert isinstance(researcher.get('model'), str)
-    assert isinstance(researcher.get('instructions'), str)
-    
-    # Test drafter config structure
-    drafter = config['drafter']
-    assert isinstance(drafter.get('max_slides'), int)
-    assert drafter.get('max_slides') <= 10, "Max slides should be <= 10"
-    assert isinstance(drafter.get('temperature'), (int, float))
-    assert isinstance(drafter.get('max_output_tokens'), int)
-    assert isinstance(drafter.get('model'), str)
-    assert isinstance(drafter.get('instructions'), str)
-    
-    # Test editor config structure
-    editor = config['editor_in_chief']
-    assert isinstance(editor.get('max_iterations'), int)
-    assert isinstance(editor.get('temperature'), (int, float))
-    assert isinstance(editor.get('max_output_tokens'), int)
-    assert isinstance(editor.get('model'), str)
-    assert isinstance(editor.get('instructions'), str)
-    
-    # Test general config
-    general = config['general']
-    assert isinstance(general.get('log_file'), str)
-    assert isinstance(general.get('max_total_iterations'), int)
-    
-    print("✅ Config structure test passed")
-
-
-def run_all_tests():
-    """Run all tests."""
-    print("\n" + "="*60)
-    print("Running Instagram Agents Tests")
-    print("="*60 + "\n")
-    
-    tests = [
-        test_module_imports,
-        test_config_loading,
-        test_config_structure,
-        test_logging_setup,
-        test_post_formatting,
-    ]
-    
-    failed = []
-    
-    for test in tests:
-        try:
-            test()
-        except Exception as e:
-            print(f"❌ {test.__name__} failed: {str(e)}")
-            failed.append(test.__name__)
-    
-    print("\n" + "="*60)
-    if not failed:
-        print("✅ All tests passed!")
-    else:
-        print(f"❌ {len(failed)} test(s) failed:")
-        for test_name in failed:
-            print(f"  - {test_name}")
-    print("="*60 + "\n")
-    
-    return len(failed) == 0
-
-
-if __name__ == "__main__":
-    success = run_all_tests()
-    sys.exit(0 if success else 1)
+    log_file = tmp_path / "test_instagram_agents.log"
+    root_logger = logging.getLogger()
+    saved_handlers, saved_level = root_logger.handlers, root_logger.level
+    
+    try:
+        logger = setup_logging(str(log_file))
+        assert logger is not None
+        logger.info("Test log message")
+        
+        # Verify log file was created
+        assert log_file.exists()
+    finally:
+        # Close the test's handlers so the file is released
+        for handler in root_logger.handlers:
+            handler.close()
+        root_logger.handlers = saved_handlers
+        root_logger.setLevel(saved_level)
+
+
+# Expected value types of each config section
+SECTION_SPECS = {
+    "researcher": {
+        "word_limit": int,
+        "temperature": (int, float),
+        "max_output_tokens": int,
+        "model": str,
+        "instructions": str,
+    },
+    "drafter": {
+        "max_slides": int,
+        "temperature": (int, float),
+        "max_output_tokens": int,
+        "model": str,
+        "instructions": str,
+    },
+    "editor_in_chief": {
+        "max_iterations": int,
+        "temperature": (int, float),
+        "max_output_tokens": int,
+        "model": str,
+        "instructions": str,
+    },
+    "general": {
+        "log_file": str,
+        "max_total_iterations": int,
+    },
+}
+
+
+@pytest.mark.parametrize("section", list(SECTION_SPECS))
+def test_config_structure(config, section):
+    """Test that each config section has all required fields."""
+    for key, expected_type in SECTION_SPECS[section].items():
+        assert isinstance(config[section].get(key), expected_type), \
+            f"{section}.{key} should be {expected_type}"
+
+
+def test_drafter_slide_limit(config):
+    """Test that the drafter never exceeds Instagram's carousel limit."""
+    assert config['drafter']['max_slides'] <= 10, "Max slides should be <= 10"
+
+
+def test_prompt_cache_exact_match():
+    """Test that the prompt cache is exact-match by default."""
+    from src.llm_cache import PromptCache
+    
+    cache = PromptCache()
+    cache.set("topic\nAdd a worked example of bagging", "cached")
+    
+    assert cache.get("topic\nAdd a worked example of bagging") == "cached"
+    assert cache.get("topic\nDo not add a worked example of bagging") is None
+    # Same words in a different order are a different request
+    assert cache.get("topic\nbagging of example worked a Add") is None
+    assert cache.get("unrelated request") is None
+
+
+@pytest.mark.parametrize("threshold, expect_hit", [(0.8, True), (0.99, False)])
+def test_prompt_cache_fuzzy_threshold(threshold, expect_hit):
+    """Test that fuzzy hits require the configured similarity."""
+    from src.llm_cache import PromptCache
+    
+    cache = PromptCache(similarity_threshold=threshold)
+    cache.set("random forests feature importance and bagging", "cached")
+    
+    # Cosine similarity of these bags of words is about 0.91
+    result = cache.get("random forests feature importance bagging")
+    assert (result == "cached") is expect_hit
+    assert cache.get("gradient boosting learning rate schedules") is None
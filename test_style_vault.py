@@ -3,167 +3,100 @@ Tests for Style Vault functionality
 """
 
 import os
-import sys
 
-# Add the project root to the path
-sys.path.insert(0, os.path.dirname(__file__))
+import pytest
 
-from src.style_vault_parser import StyleVaultParser
 
-
-def test_style_vault_loading():
-    """Test that style vault can be loaded and parsed."""
-    print("Testing style vault loading...")
-    
-    parser = StyleVaultParser("style_vault.md")
-    posts = parser.load_style_vault()
-    
-    assert len(posts) > 0, "Style vault should contain at least one post"
-    print(f"✅ Loaded {len(posts)} posts from style vault")
+def test_style_vault_loading(style_posts):
+    """Test that style vault can be loaded and its posts and slides parsed."""
+    assert len(style_posts) > 0, f"Style vault should contain at least one post, got {len(style_posts)}"
     
     # Check first post structure
-    first_post = posts[0]
+    first_post = style_posts[0]
     assert "id" in first_post, "Post should have an id"
     assert "topic" in first_post, "Post should have a topic"
     assert "style" in first_post, "Post should have a style"
     assert "slides" in first_post, "Post should have slides"
     assert "slide_count" in first_post, "Post should have slide_count"
     
-    print(f"✅ Post structure validated")
-    print(f"   First post: {first_post['topic']} ({first_post['slide_count']} slides)")
-
-
-def test_slide_structure():
-    """Test that slides are properly parsed."""
-    print("\nTesting slide structure...")
-    
-    parser = StyleVaultParser("style_vault.md")
-    posts = parser.load_style_vault()
+    # Check first slide structure
+    slides = first_post["slides"]
+    assert len(slides) > 0, "Post should have at least one slide"
     
-    if posts:
-        first_post = posts[0]
-        slides = first_post["slides"]
-        
-        assert len(slides) > 0, "Post should have at least one slide"
-        
-        first_slide = slides[0]
-        assert "page_number" in first_slide, "Slide should have page_number"
-        assert "title" in first_slide, "Slide should have title"
-        assert "content" in first_slide, "Slide should have content"
-        assert "layout" in first_slide, "Slide should have layout"
-        
-        print(f"✅ Slide structure validated")
-        print(f"   First slide title: {first_slide['title']}")
+    first_slide = slides[0]
+    assert "page_number" in first_slide, "Slide should have page_number"
+    assert "title" in first_slide, "Slide should have title"
+    assert "content" in first_slide, "Slide should have content"
+    assert "layout" in first_slide, "Slide should have layout"
 
 
-def test_get_post_by_id():
+def test_get_post_by_id(style_parser):
     """Test retrieving a post by ID."""
-    print("\nTesting get post by ID...")
-    
-    parser = StyleVaultParser("style_vault.md")
-    
     # Try to get the Random Forests example
-    post = parser.get_post_by_id("random-forests-example")
-    
-    if post:
-        assert post["id"] == "random-forests-example"
-        assert "Random" in post["topic"]
-        print(f"✅ Retrieved post by ID: {post['topic']}")
-    else:
-        print("⚠️  Post not found (check if style_vault.md exists and has the example)")
-
-
-def test_get_posts_by_topic():
-    """Test retrieving posts by topic."""
-    print("\nTesting get posts by topic...")
-    
-    parser = StyleVaultParser("style_vault.md")
-    posts = parser.get_posts_by_topic("Random")
+    post = style_parser.get_post_by_id("random-forests-example")
     
-    assert isinstance(posts, list), "Should return a list"
-    print(f"✅ Found {len(posts)} posts matching 'Random'")
+    assert post is not None, "Random Forests example should be in the style vault"
+    assert post["id"] == "random-forests-example"
+    assert "Random" in post["topic"]
 
 
-def test_get_posts_by_style():
-    """Test retrieving posts by style."""
-    print("\nTesting get posts by style...")
-    
-    parser = StyleVaultParser("style_vault.md")
-    posts = parser.get_posts_by_style("educational-technical")
+@pytest.mark.parametrize("method,arg", [
+    ("get_posts_by_topic", "Random"),
+    ("get_posts_by_style", "educational-technical"),
+])
+def test_filter_posts(style_parser, method, arg):
+    """Test retrieving posts by topic or style."""
+    posts = getattr(style_parser, method)(arg)
     
     assert isinstance(posts, list), "Should return a list"
-    print(f"✅ Found {len(posts)} posts with style 'educational-technical'")
 
 
-def test_format_post_as_example():
+def test_format_post_as_example(style_parser, style_posts):
     """Test formatting a post as an example."""
-    print("\nTesting format post as example...")
-    
-    parser = StyleVaultParser("style_vault.md")
-    posts = parser.load_style_vault()
-    
-    if posts:
-        formatted = parser.format_post_as_example(posts[0])
+    if style_posts:
+        formatted = style_parser.format_post_as_example(style_posts[0])
         
         assert len(formatted) > 0, "Formatted output should not be empty"
         assert "Example Post:" in formatted, "Should include 'Example Post:' header"
         assert "Style:" in formatted, "Should include style information"
-        
-        print(f"✅ Successfully formatted post as example")
-        print(f"   Output length: {len(formatted)} characters")
 
 
-def test_get_style_examples_for_prompt():
+def test_get_style_examples_for_prompt(style_parser):
     """Test getting style examples for LLM prompt."""
-    print("\nTesting get style examples for prompt...")
-    
-    parser = StyleVaultParser("style_vault.md")
-    examples = parser.get_style_examples_for_prompt(limit=2)
+    examples = style_parser.get_style_examples_for_prompt(limit=2)
     
     assert len(examples) > 0, "Should return example text"
     assert "STYLE REFERENCE" in examples, "Should include header"
-    
-    print(f"✅ Generated style examples for prompt")
-    print(f"   Output length: {len(examples)} characters")
 
 
-def run_all_tests():
-    """Run all style vault tests."""
-    print("\n" + "="*60)
-    print("Running Style Vault Tests")
-    print("="*60 + "\n")
+def test_style_vault_cache(tmp_path):
+    """Test that parsed posts are cached until the vault file changes."""
+    from src.style_vault_parser import StyleVaultParser
+    
+    post_template = """<post id="{id}" topic="Cache Test" style="educational" slides="1">
+### Slide 1
+**Title:** Title
+**Content:** Content
+**Layout:** Layout
+</post>
+"""
     
-    tests = [
-        test_style_vault_loading,
-        test_slide_structure,
-        test_get_post_by_id,
-        test_get_posts_by_topic,
-        test_get_posts_by_style,
-        test_format_post_as_example,
-        test_get_style_examples_for_prompt,
-    ]
+    vault_file = tmp_path / "vault.md"
+    vault_file.write_text(post_template.format(id="first"), encoding="utf-8")
     
-    failed = []
+    parser = StyleVaultParser(str(vault_file))
+    first = parser.load_style_vault()
+    cached = parser.load_style_vault()
     
-    for test in tests:
-        try:
-            test()
-        except Exception as e:
-            print(f"❌ {test.__name__} failed: {str(e)}")
-            failed.append(test.__name__)
+    assert first == cached, "Unchanged file should return the cached posts"
+    assert cached[0] is first[0], "Unchanged file should not be re-parsed"
+    assert parser.get_style_examples_for_prompt(limit=2).count("Example Post:") == 1
     
-    print("\n" + "="*60)
-    if not failed:
-        print("✅ All style vault tests passed!")
-    else:
-        print(f"❌ {len(failed)} test(s) failed:")
-        for test_name in failed:
-            print(f"  - {test_name}")
-    print("="*60 + "\n")
+    with open(vault_file, "a", encoding="utf-8") as f:
+        f.write(post_template.format(id="second"))
+    os.utime(vault_file, ns=(0, os.stat(vault_file).st_mtime_ns + 1_000_000))
     
-    return len(failed) == 0
-
-
-if __name__ == "__main__":
-    success = run_all_tests()
-    sys.exit(0 if success else 1)
+    reloaded = parser.load_style_vault()
+    assert [post["id"] for post in reloaded] == ["first", "second"], "Modified file should be re-parsed"
+    assert parser.get_style_examples_for_prompt(limit=2).count("Example Post:") == 2, \
+        "Modified file should re-format the prompt examples"
@@ -0,0 +1,240 @@
+"""
+Tests for the LangGraph workflow, run end to end against fake language models.
+"""
+
+import asyncio
+
+import orjson
+
+
+RESEARCH = {
+    "topic": "Random Forests",
+    "research_content": "Random forests average many decorrelated trees.",
+    "research_preview": "Random forests average many decorrelated trees.",
+    "focus_areas": None,
+    "word_count": 6,
+}
+
+
+def _post_json(title):
+    """Drafter response with a single slide titled title."""
+    return orjson.dumps({
+        "slides": [
+            {"page_number": 1, "title": title, "content": "Body", "layout": "Centered"}
+        ]
+    }).decode()
+
+
+def _review_json(decision):
+    """Editor response carrying the given decision."""
+    return orjson.dumps({
+        "decision": decision,
+        "feedback": f"Feedback for {decision}",
+        "specific_issues": [],
+        "suggestions": ["Add an example"],
+    }).decode()
+
+
+class FakeResearcher:
+    """Researcher returning canned research without calling Tavily."""
+
+    def research(self, topic, focus_areas=None):
+        return dict(RESEARCH, topic=topic, focus_areas=focus_areas)
+
+    async def aresearch(self, topic, focus_areas=None):
+        return self.research(topic, focus_areas)
+
+
+def _build_workflow(drafter_responses, editor_responses, drafter_config=None, max_iterations=10):
+    """Wire the real drafter and editor agents to fake chat models."""
+    from langchain_core.language_models.fake_chat_models import FakeListChatModel
+    from src.drafter_agent import DrafterAgent
+    from src.editor_agent import EditorInChiefAgent
+    from src.workflow import InstagramWorkflow
+
+    researcher = FakeResearcher()
+    drafter = DrafterAgent(
+        {"use_style_vault": False, **(drafter_config or {})},
+        FakeListChatModel(responses=drafter_responses)
+    )
+    editor = EditorInChiefAgent({}, FakeListChatModel(responses=editor_responses), researcher, drafter)
+    return InstagramWorkflow(researcher, drafter, editor, max_iterations)
+
+
+def test_arun_revises_until_approved():
+    """Test that the async workflow drafts, revises and finalizes via ainvoke."""
+    workflow = _build_workflow(
+        [_post_json("First draft"), _post_json("Revised draft")],
+        [_review_json("revise_draft"), _review_json("approve")],
+    )
+
+    result = asyncio.run(workflow.arun("Random Forests"))
+
+    assert result["iterations"] == 2
+    assert result["final_post"]["post"]["slides"][0]["title"] == "Revised draft"
+    assert result["research_data"]["topic"] == "Random Forests"
+
+
+def test_arun_drafts_slides_in_parallel():
+    """Test that parallel_slides plans an outline and writes each slide on the async path."""
+    outline = orjson.dumps({"titles": ["Definition", "How it works", "Takeaways"]}).decode()
+    slide = orjson.dumps({"title": "Slide", "content": "Body", "layout": "Centered"}).decode()
+    workflow = _build_workflow(
+        [outline, slide, slide, slide],
+        [_review_json("approve")],
+        drafter_config={"parallel_slides": True, "slide_concurrency": 2},
+    )
+
+    result = asyncio.run(workflow.arun("Random Forests"))
+
+    slides = result["final_post"]["post"]["slides"]
+    assert result["final_post"]["slide_count"] == 3
+    assert [s["page_number"] for s in slides] == [1, 2, 3]
+
+
+class FakeDrafter:
+    """Drafter returning the same empty post every time."""
+
+    def draft_post(self, research_data, revision_feedback=None):
+        return {"topic": research_data.get("topic"), "post": {"slides": []}, "slide_count": 0}
+
+
+class StuckEditor:
+    """Editor that always asks for the same revision and counts executions."""
+
+    def __init__(self):
+        self.executions = 0
+
+    def review_post(self, post_data, research_data):
+        return {"decision": "revise_draft", "feedback": "Tighten it", "suggestions": []}
+
+    def execute_action(self, review_decision, research_data, post_data, topic):
+        self.executions += 1
+        return research_data, post_data
+
+
+def test_revise_cache_reuses_identical_revisions():
+    """Test that a repeated review reuses the revision and each run starts with an empty cache."""
+    from src.workflow import InstagramWorkflow
+
+    editor = StuckEditor()
+    workflow = InstagramWorkflow(FakeResearcher(), FakeDrafter(), editor, max_iterations=3)
+
+    result = workflow.run("Random Forests")
+
+    # Three reviews and two revisions, but only the first revision executes
+    assert result["iterations"] == 3
+    assert editor.executions == 1
+
+    workflow.run("Random Forests")
+    assert editor.executions == 2, "_initial_state should clear the revision cache"
+
+
+def test_log_workflow_state(caplog):
+    """Test that workflow state logging reads the WorkflowState dataclass."""
+    import logging
+    from src.utils import log_workflow_state
+    from src.workflow import WorkflowState
+
+    state = WorkflowState(
+        topic="Random Forests",
+        iteration=2,
+        review_decision={"decision": "approve", "feedback": "Ship it"},
+    )
+
+    with caplog.at_level(logging.INFO, logger="src.utils"):
+        log_workflow_state(state, "review", "unused.log")
+
+    assert '"decision":"approve"' in caplog.text
+    assert '"iteration":2' in caplog.text
+    assert "Error logging workflow state" not in caplog.text
+
+
+class FakeStructuredModel:
+    """Chat model stub whose structured-output runnables pop queued results in call order."""
+
+    def __init__(self, outputs):
+        self.outputs = list(outputs)
+
+    def with_structured_output(self, schema, include_raw=False):
+        return _FakeStructuredRunnable(self)
+
+
+class _FakeStructuredRunnable:
+    """include_raw-style runnable; a queued exception becomes a parsing_error."""
+
+    def __init__(self, model):
+        self.model = model
+
+    def invoke(self, messages):
+        output = self.model.outputs.pop(0)
+        if isinstance(output, Exception):
+            return {"raw": None, "parsed": None, "parsing_error": output}
+        return {"raw": None, "parsed": output, "parsing_error": None}
+
+    async def ainvoke(self, messages):
+        return self.invoke(messages)
+
+
+def _post(title):
+    """Structured drafter output with a single slide titled title."""
+    return orjson.loads(_post_json(title))
+
+
+def _review(decision):
+    """Structured editor output carrying the given decision."""
+    return orjson.loads(_review_json(decision))
+
+
+def _build_fused_workflow(drafter_outputs, editor_outputs):
+    """Workflow with fuse_first_review, wired to structured-output fakes."""
+    from src.drafter_agent import DrafterAgent
+    from src.editor_agent import EditorInChiefAgent
+    from src.workflow import InstagramWorkflow
+
+    researcher = FakeResearcher()
+    drafter = DrafterAgent({"use_style_vault": False}, FakeStructuredModel(drafter_outputs))
+    editor = EditorInChiefAgent({}, FakeStructuredModel(editor_outputs), researcher, drafter)
+    return InstagramWorkflow(researcher, drafter, editor, fuse_first_review=True), drafter, editor
+
+
+def test_fused_first_review_routes_into_revise_loop():
+    """Test that a fused draft-and-review hands off to the revise and review nodes."""
+    workflow, drafter, editor = _build_fused_workflow(
+        [_post("Revised draft")],
+        [{"draft": _post("Fused draft"), "review": _review("revise_draft")}, _review("approve")],
+    )
+
+    result = workflow.run("Random Forests")
+
+    # Fused pass, then one revision and a standalone review
+    assert result["iterations"] == 2
+    assert result["final_post"]["post"]["slides"][0]["title"] == "Revised draft"
+    assert drafter.llm.outputs == [] and editor.llm.outputs == []
+
+
+def test_fused_first_review_approves_in_one_call():
+    """Test that an approving fused response finalizes its own draft."""
+    workflow, drafter, editor = _build_fused_workflow(
+        [],
+        [{"draft": _post("Fused draft"), "review": _review("approve")}],
+    )
+
+    result = workflow.run("Random Forests")
+
+    assert result["iterations"] == 1
+    assert result["final_post"]["post"]["slides"][0]["title"] == "Fused draft"
+
+
+def test_fused_parsing_error_falls_back_to_separate_calls():
+    """Test that a fused parsing error drafts and reviews with separate calls."""
+    workflow, drafter, editor = _build_fused_workflow(
+        [_post("Separate draft")],
+        [ValueError("bad fused output"), _review("approve")],
+    )
+
+    result = workflow.run("Random Forests")
+
+    assert result["iterations"] == 1
+    assert result["final_post"]["post"]["slides"][0]["title"] == "Separate draft"
+    assert drafter.llm.outputs == [] and editor.llm.outputs == []